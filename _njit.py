@@ -0,0 +1,14 @@
+"""
+Optional Numba JIT: re-exports numba.njit, or a no-op decorator when numba is absent
+"""
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit; supports both @njit and @njit(...)"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
@@ -36,6 +36,7 @@ class AnalysisConfig:
 
     # Exchange Settings
     EXCHANGE = 'binance'
+    DATA_EXCHANGES = ['kucoin', 'okx', 'gate']  # Tried in order for market data
 
     # Deployment Settings
     PORT = int(os.getenv('PORT', 8000))
@@ -1,140 +1,496 @@
 """
 Enhanced data fetcher with unrestricted data sources
 """
-import ccxt
+import asyncio
+import ccxt.pro as ccxt
+import diskcache
+import httpx
+import numpy as np
+import orjson
 import pandas as pd
-import requests
-from datetime import datetime
+from cachetools import TLRUCache, TTLCache
+from collections import deque
+from dataclasses import dataclass
 import logging
+import time
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
+# KuCoin, OKX and Gate.io are generally reachable without regional restrictions
+_DEFAULT_EXCHANGES = ('kucoin', 'okx', 'gate')
+
+# Map symbols to CoinGecko IDs
+_COIN_MAP = MappingProxyType({
+    'ETH/USDT': 'ethereum',
+    'BTC/USDT': 'bitcoin',
+    'SOL/USDT': 'solana'
+})
+
+# Storage dtype for cached OHLC prices
+_PRICE_DTYPE = np.float32
+
+# Seconds an OHLCV response stays fresh, per timeframe
+_OHLCV_TTL = {'15m': 60, '1h': 300, '4h': 900, '1d': 3600}
+_DEFAULT_OHLCV_TTL = 60
+
+# Bars of exchange OHLCV history kept on disk per (exchange, symbol, timeframe);
+# requests slice their own limit from it
+_DISK_HISTORY_BARS = 1000
+
+# CoinGecko fallback history window; ranges shorter than a day come back
+# at 5-minute granularity, so delta requests never span less than that
+_COINGECKO_HISTORY_SECONDS = 7 * 86400
+_COINGECKO_MIN_RANGE_SECONDS = 86400 + 3600
+
+# Resampling of the hourly CoinGecko series to coarser timeframes; fewer bars
+# than the slow MACD period would leave the indicators empty
+_COINGECKO_BAR = pd.Timedelta('1h')
+_COINGECKO_BAR_MS = int(_COINGECKO_BAR / pd.Timedelta('1ms'))
+_PANDAS_FREQ = {'15m': '15min', '1h': '1h', '4h': '4h', '1d': '1D'}
+_OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+_MIN_RESAMPLED_BARS = 26
+
+# Explicit request timeouts; the pool wait is unbounded because concurrency is
+# capped by a semaphore before a request starts
+_EXCHANGE_TIMEOUT_MS = 5000
+_HTTP_CONCURRENCY = 8
+
+def _http_timeout(read: float) -> httpx.Timeout:
+    return httpx.Timeout(connect=2.0, read=read, write=2.0, pool=None)
+
+# HTTP retry policy for transient CoinGecko failures
+_HTTP_RETRIES = 2
+_HTTP_BACKOFF = 0.3
+_HTTP_RETRY_STATUSES = {429, 502, 503, 504}
+
+# Window for coalescing concurrent /simple/price lookups into one request
+_PRICE_BATCH_WINDOW = 0.05
+
+# Window for coalescing concurrent get_current_price calls into one fetch_tickers
+_TICKER_BATCH_WINDOW = 0.01
+
+# Seconds between background pings that keep exchange connections warm
+_KEEPALIVE_INTERVAL = 15
+
+# Websocket OHLCV streams: a buffer counts as live if updated this recently,
+# and a dropped stream is resubscribed after a short pause
+_STREAM_STALE_SECONDS = 120
+_STREAM_RETRY_DELAY = 5
+
+@dataclass(slots=True)
+class OHLCVSeries:
+    """Column-oriented OHLCV bars; timestamps are epoch milliseconds
+    
+    Prices are stored as float32 (ample precision for indicators, half the
+    memory); volume stays float64 since it can exceed float32's exact range.
+    """
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    @classmethod
+    def from_rows(cls, ohlcv: list) -> 'OHLCVSeries':
+        """Build from ccxt-style [timestamp, open, high, low, close, volume] rows"""
+        # One typed conversion instead of per-cell inference on nested lists
+        arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+        prices = arr[:, 1:5].astype(_PRICE_DTYPE).T
+        return cls(arr[:, 0].astype(np.int64), *prices, arr[:, 5])
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'OHLCVSeries':
+        ts = df.index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+        prices = (df[col].to_numpy(dtype=_PRICE_DTYPE) for col in ('open', 'high', 'low', 'close'))
+        return cls(ts, *prices, df['volume'].to_numpy(dtype=np.float64))
+    
+    def __len__(self) -> int:
+        return len(self.ts)
+    
+    def __getitem__(self, index) -> 'OHLCVSeries':
+        return OHLCVSeries(self.ts[index], self.open[index], self.high[index],
+                           self.low[index], self.close[index], self.volume[index])
+    
+    def merge(self, other: 'OHLCVSeries') -> 'OHLCVSeries':
+        """Append newer bars, rows from `other` replacing bars with the same timestamp"""
+        ts = np.concatenate([self.ts, other.ts])
+        # Index of the last occurrence of each timestamp, in ascending time order
+        _, first_from_end = np.unique(ts[::-1], return_index=True)
+        keep = len(ts) - 1 - first_from_end
+        return OHLCVSeries(
+            ts[keep],
+            *(np.concatenate([getattr(self, col), getattr(other, col)])[keep]
+              for col in ('open', 'high', 'low', 'close', 'volume'))
+        )
+    
+    def to_dataframe(self) -> pd.DataFrame:
+        """Timestamp-indexed float64 DataFrame for pandas/TA-Lib consumers"""
+        return pd.DataFrame(
+            {'open': self.open.astype(np.float64), 'high': self.high.astype(np.float64),
+             'low': self.low.astype(np.float64), 'close': self.close.astype(np.float64),
+             'volume': self.volume},
+            index=pd.DatetimeIndex(self.ts.view('datetime64[ms]'), name='timestamp'),
+            copy=False
+        )
+
+class Circuit:
+    """Per-exchange circuit breaker: skip an endpoint after repeated failures"""
+    
+    def __init__(self, fail_threshold=3, reset_after=60.0):
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+    
+    def is_open(self) -> bool:
+        """True while requests should be skipped; lets one trial through after the cooldown"""
+        if self.opened_at is None:
+            return False
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            # Half-open: allow this trial and hold off others until it reports back
+            self.opened_at = time.monotonic()
+            return False
+        return True
+    
+    @property
+    def is_closed(self) -> bool:
+        """True while not tripped; unlike is_open() this never takes the half-open trial"""
+        return self.opened_at is None
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.fail_threshold:
+            self.opened_at = time.monotonic()
+
 class CryptoDataFetcher:
-    def __init__(self, exchange_name='binance'):
+    def __init__(self, exchanges: list = None, cache_dir='./ohlcv_cache'):
         # Use exchanges that work globally without restrictions
         self.exchanges = []
         
-        # Try multiple unrestricted exchanges
-        try:
-            # KuCoin - Generally unrestricted
-            self.exchanges.append(ccxt.kucoin({
-                'sandbox': False,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            }))
-            logger.info("✅ KuCoin exchange available")
-        except:
-            pass
-            
-        try:
-            # OKX - Good global coverage
-            self.exchanges.append(ccxt.okx({
-                'sandbox': False,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            }))
-            logger.info("✅ OKX exchange available")
-        except:
-            pass
-            
-        try:
-            # Gate.io - Usually unrestricted
-            self.exchanges.append(ccxt.gateio({
-                'sandbox': False,
-                'enableRateLimit': True,
-                'options': {'defaultType': 'spot'}
-            }))
-            logger.info("✅ Gate.io exchange available")
-        except:
-            pass
+        for exchange_id in exchanges or _DEFAULT_EXCHANGES:
+            try:
+                self.exchanges.append(getattr(ccxt, exchange_id)({
+                    'sandbox': False,
+                    'enableRateLimit': True,
+                    'timeout': _EXCHANGE_TIMEOUT_MS,
+                    'options': {'defaultType': 'spot'}
+                }))
+                logger.info(f"✅ {exchange_id} exchange available")
+            except (AttributeError, ccxt.BaseError) as e:
+                logger.warning(f"⚠️ {exchange_id} exchange unavailable: {e}")
+        
+        # One circuit breaker per exchange
+        self._circuits = {exchange.id: Circuit() for exchange in self.exchanges}
         
         # CoinGecko for fallback data
         self.coingecko_base = "https://api.coingecko.com/api/v3"
+        # Pre-encoded request URLs; only the varying parts are appended per call
+        self._simple_price_url = (
+            f"{self.coingecko_base}/simple/price"
+            "?vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&ids="
+        )
+        self._chart_url = {
+            coin_id: f"{self.coingecko_base}/coins/{coin_id}/market_chart/range?vs_currency=usd"
+            for coin_id in _COIN_MAP.values()
+        }
+        # Shared HTTP/2 client: one pooled, compressed connection kept warm between ticks
+        self.http = httpx.AsyncClient(
+            http2=True,
+            headers={'Accept-Encoding': 'gzip'},
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=90),
+            timeout=_http_timeout(5.0)
+        )
+        # Bounds in-flight requests so timeouts only start once a slot is held
+        self._http_slots = asyncio.Semaphore(_HTTP_CONCURRENCY)
+        
+        # In-process response caches
+        self._ohlcv_cache = TLRUCache(
+            maxsize=256,
+            ttu=lambda key, value, now: now + _OHLCV_TTL.get(key[2], _DEFAULT_OHLCV_TTL)
+        )
+        self._context_cache = TTLCache(maxsize=64, ttl=60)
+        
+        # Pending /simple/price lookups, keyed by CoinGecko coin id
+        self._pending_prices = {}
+        self._price_flush_task = None
+        
+        # Pending get_current_price lookups, keyed by symbol
+        self._pending_tickers = {}
+        self._ticker_flush_task = None
+        
+        self._keepalive_task = None
+        
+        # Rolling websocket candle buffers, keyed by (symbol, timeframe)
+        self._buffers = {}
+        self._buffer_updated = {}
+        self._stream_tasks = []
+        
+        # On-disk OHLCV history, survives restarts so only new bars are fetched;
+        # its sqlite reads/writes run in worker threads to keep them off the event loop
+        self.cache = diskcache.Cache(cache_dir)
+        
+    async def _get_json(self, url: str, params: dict = None, timeout: float = 5.0):
+        """GET a JSON payload, retrying transient failures with backoff"""
+        for attempt in range(_HTTP_RETRIES + 1):
+            try:
+                async with self._http_slots:
+                    response = await self.http.get(url, params=params, timeout=_http_timeout(timeout))
+                if response.status_code in _HTTP_RETRY_STATUSES and attempt < _HTTP_RETRIES:
+                    response.raise_for_status()
+                return orjson.loads(response.content)
+            except (httpx.TransportError, httpx.HTTPStatusError):
+                if attempt >= _HTTP_RETRIES:
+                    raise
+                await asyncio.sleep(_HTTP_BACKOFF * (2 ** attempt))
+    
+    async def warmup(self):
+        """Load exchange markets and open connections ahead of the first request"""
+        async def warm(exchange):
+            try:
+                await asyncio.gather(exchange.load_markets(), exchange.fetch_time())
+                logger.info(f"✅ {exchange.id} warmed up")
+            except Exception as e:
+                logger.warning(f"⚠️ {exchange.id} warmup failed: {str(e)[:100]}")
+        
+        await asyncio.gather(*(warm(exchange) for exchange in self.exchanges))
+        
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+    
+    async def _keepalive_loop(self):
+        """Ping each exchange periodically so pooled connections stay open"""
+        while True:
+            await asyncio.sleep(_KEEPALIVE_INTERVAL)
+            await asyncio.gather(
+                # Only healthy exchanges; a tripped one keeps its trial slot for a real request
+                *(exchange.fetch_time() for exchange in self.exchanges if self._circuits[exchange.id].is_closed),
+                return_exceptions=True
+            )
+    
+    async def start_streams(self, symbols: list, timeframes: list, limit: int = 200):
+        """Subscribe to websocket OHLCV for each (symbol, timeframe) on the first usable exchange"""
+        if self._stream_tasks:
+            return
+        for exchange in self.exchanges:
+            if exchange.has.get('watchOHLCV') and self._circuits[exchange.id].is_closed:
+                self._stream_tasks = [
+                    asyncio.create_task(self._stream_ohlcv(exchange, symbol, timeframe, limit))
+                    for symbol in symbols for timeframe in timeframes
+                ]
+                logger.info(f"✅ {exchange.id}: streaming {len(self._stream_tasks)} OHLCV feeds")
+                return
+        logger.warning("⚠️ No exchange available for OHLCV streaming - using REST polling")
+    
+    async def _stream_ohlcv(self, exchange, symbol: str, timeframe: str, limit: int):
+        """Keep a rolling buffer of candles fed by watch_ohlcv, backfilled over REST"""
+        key = (symbol, timeframe)
+        buffer = deque(maxlen=limit)
+        while True:
+            try:
+                if not buffer:
+                    # Cold start: seed the buffer with REST history
+                    series = await self._fetch_ohlcv(exchange, symbol, timeframe, limit)
+                    buffer.extend(zip(series.ts.tolist(), series.open.tolist(), series.high.tolist(),
+                                      series.low.tolist(), series.close.tolist(), series.volume.tolist()))
+                    self._buffers[key] = buffer
+                
+                for candle in await exchange.watch_ohlcv(symbol, timeframe):
+                    if candle[0] == buffer[-1][0]:
+                        buffer[-1] = candle
+                    elif candle[0] > buffer[-1][0]:
+                        buffer.append(candle)
+                self._buffer_updated[key] = time.monotonic()
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ {exchange.id} {symbol} {timeframe} stream error: {str(e)[:100]}")
+                await asyncio.sleep(_STREAM_RETRY_DELAY)
+    
+    def _streamed_market_data(self, symbol: str, timeframes: list, limit: int):
+        """Market data from live stream buffers, or None if any timeframe is not live"""
+        now = time.monotonic()
+        market_data = {}
+        for timeframe in timeframes:
+            key = (symbol, timeframe)
+            buffer = self._buffers.get(key)
+            if not buffer or now - self._buffer_updated.get(key, 0) > _STREAM_STALE_SECONDS:
+                return None
+            market_data[timeframe] = OHLCVSeries.from_rows(list(buffer))[-limit:].to_dataframe()
+        return market_data
+    
+    async def close(self):
+        """Release exchange and HTTP connections"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        for task in self._stream_tasks:
+            task.cancel()
+        await asyncio.gather(*self._stream_tasks, return_exceptions=True)
+        self._stream_tasks = []
+        await asyncio.gather(*(exchange.close() for exchange in self.exchanges), return_exceptions=True)
+        await self.http.aclose()
+        self.cache.close()
+    
+    @staticmethod
+    def _cached_series(cached):
+        """Disk entries written before the SoA layout are ignored"""
+        if isinstance(cached, OHLCVSeries) and len(cached):
+            return cached
+        return None
+    
+    @staticmethod
+    async def _call_exchange(exchange, method: str, *args, **kwargs):
+        """Call an exchange API method, waiting out one rate-limit rejection before retrying"""
+        try:
+            return await getattr(exchange, method)(*args, **kwargs)
+        except ccxt.RateLimitExceeded:
+            await asyncio.sleep(exchange.rateLimit / 1000)
+            return await getattr(exchange, method)(*args, **kwargs)
+    
+    async def _fetch_ohlcv(self, exchange, symbol: str, timeframe: str, limit: int) -> OHLCVSeries:
+        """Fetch one timeframe of OHLCV bars"""
+        key = (exchange.id, symbol, timeframe, limit)
+        cached = self._ohlcv_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        disk_key = (exchange.id, symbol, timeframe)
+        cached_series = self._cached_series(await asyncio.to_thread(self.cache.get, disk_key))
+        
+        history = None
+        # A delta fetch only works if the stored history already covers this limit
+        if cached_series is not None and len(cached_series) >= limit:
+            # Only ask for bars from the last cached (possibly unfinished) bar on
+            since = int(cached_series.ts[-1])
+            ohlcv = await self._call_exchange(exchange, 'fetch_ohlcv', symbol, timeframe, since=since, limit=limit)
+            # A full page means there may be a gap after it, so refetch instead
+            if len(ohlcv) < limit:
+                history = cached_series.merge(OHLCVSeries.from_rows(ohlcv))
+        
+        if history is None:
+            ohlcv = await self._call_exchange(exchange, 'fetch_ohlcv', symbol, timeframe, limit=limit)
+            history = OHLCVSeries.from_rows(ohlcv)
+        
+        # Persist the untruncated history (capped); only the returned view is cut to limit
+        await asyncio.to_thread(self.cache.set, disk_key, history[-max(limit, _DISK_HISTORY_BARS):])
+        series = history[-limit:]
+        self._ohlcv_cache[key] = series
+        return series
         
     async def get_market_data(self, symbol: str, timeframes: list, limit: int = 200) -> dict:
         """Get market data from available exchanges"""
         try:
+            # Start the CoinGecko context request alongside the exchange requests
+            context_task = asyncio.ensure_future(self._get_market_context(symbol))
+            
+            # Serve from websocket buffers when every timeframe is streaming
+            market_data = self._streamed_market_data(symbol, timeframes, limit)
+            if market_data is not None:
+                market_data['market_context'] = await context_task
+                return market_data
+            
             # Try each exchange until one works
             for exchange in self.exchanges:
+                circuit = self._circuits[exchange.id]
+                if circuit.is_open():
+                    continue
                 try:
-                    market_data = {}
                     exchange_name = exchange.id
                     
-                    for timeframe in timeframes:
-                        ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-                        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                        df.set_index('timestamp', inplace=True)
-                        market_data[timeframe] = df
+                    # Fetch all timeframes concurrently
+                    results = await asyncio.gather(
+                        *(self._fetch_ohlcv(exchange, symbol, timeframe, limit) for timeframe in timeframes),
+                        return_exceptions=True
+                    )
+                    for result in results:
+                        if isinstance(result, Exception):
+                            raise result
+                    
+                    circuit.record_success()
+                    market_data = {timeframe: series.to_dataframe() for timeframe, series in zip(timeframes, results)}
                     
                     logger.info(f"✅ {exchange_name}: {symbol} data fetched successfully")
                     
                     # Add market context from CoinGecko
-                    context = await self._get_market_context(symbol)
-                    market_data['market_context'] = context
+                    market_data['market_context'] = await context_task
                     
                     return market_data
                     
+                except ccxt.RateLimitExceeded as e:
+                    # Throttled, not down: move on without tripping the circuit
+                    logger.warning(f"⚠️ {exchange.id} rate limited: {str(e)[:100]}")
+                    continue
+                except ccxt.NetworkError as e:
+                    # Only connectivity failures count toward tripping the circuit
+                    circuit.record_failure()
+                    logger.warning(f"⚠️ {exchange.id} failed: {str(e)[:100]}")
+                    continue
                 except Exception as e:
                     logger.warning(f"⚠️ {exchange.id} failed: {str(e)[:100]}")
                     continue
             
             # If all exchanges fail, use CoinGecko as last resort
             logger.warning("🔄 All exchanges failed, trying CoinGecko fallback...")
-            return await self._get_coingecko_fallback_data(symbol, timeframes)
+            return await self._get_coingecko_fallback_data(symbol, timeframes, context_task)
             
         except Exception as e:
             logger.error(f"❌ All data sources failed: {e}")
             return {}
     
-    async def _get_coingecko_fallback_data(self, symbol: str, timeframes: list) -> dict:
+    async def _get_coingecko_fallback_data(self, symbol: str, timeframes: list, context_task=None) -> dict:
         """Fallback to CoinGecko when exchanges are blocked"""
         try:
-            # Map symbols to CoinGecko IDs
-            coin_map = {
-                'ETH/USDT': 'ethereum',
-                'BTC/USDT': 'bitcoin',
-                'SOL/USDT': 'solana'
-            }
+            coin_id = _COIN_MAP.get(symbol, 'ethereum')
             
-            coin_id = coin_map.get(symbol, 'ethereum')
+            # Only request the range not already cached on disk
+            disk_key = ('coingecko', coin_id)
+            cached_series = self._cached_series(await asyncio.to_thread(self.cache.get, disk_key))
+            now = int(time.time())
+            start = now - _COINGECKO_HISTORY_SECONDS
+            if cached_series is not None:
+                last_cached = int(cached_series.ts[-1]) // 1000
+                start = max(start, min(last_cached, now - _COINGECKO_MIN_RANGE_SECONDS))
             
             # Get historical data from CoinGecko
-            url = f"{self.coingecko_base}/coins/{coin_id}/market_chart"
-            params = {
-                'vs_currency': 'usd',
-                'days': '7',  # 7 days of data
-                'interval': 'hourly'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            url = self._chart_url.get(coin_id) or f"{self.coingecko_base}/coins/{coin_id}/market_chart/range?vs_currency=usd"
+            data = await self._get_json(f"{url}&from={start}&to={now}", None, timeout=10)
             
             if 'prices' in data:
                 # Convert CoinGecko data to OHLCV format
-                prices = data['prices']
-                volumes = data.get('total_volumes', [])
-                
-                # Create basic OHLCV data (simplified)
-                ohlcv_data = []
-                for i, (timestamp, price) in enumerate(prices):
-                    volume = volumes[i][1] if i < len(volumes) else 0
-                    # Use price as OHLC (simplified for demo)
-                    ohlcv_data.append([timestamp, price, price * 1.001, price * 0.999, price, volume])
+                p = np.asarray(data['prices'], dtype=np.float64).reshape(-1, 2)
+                v = np.asarray(data.get('total_volumes', []), dtype=np.float64).reshape(-1, 2)
+                close = p[:, 1].astype(_PRICE_DTYPE)
+                volume = np.zeros(len(close))
+                volume[:len(v)] = v[:len(close), 1]
                 
-                # Create DataFrame
-                df = pd.DataFrame(ohlcv_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df.set_index('timestamp', inplace=True)
+                # Create basic OHLCV data (simplified: price used as OHLC). Samples are floored
+                # to the hour so the trailing live sample is the current hour's bar, replaced
+                # on later calls, rather than an extra off-grid bar appended to the history
+                ts = p[:, 0].astype(np.int64) // _COINGECKO_BAR_MS * _COINGECKO_BAR_MS
+                series = OHLCVSeries(ts, close, close * _PRICE_DTYPE(1.001),
+                                     close * _PRICE_DTYPE(0.999), close, volume)
+                # merge keeps the latest sample per hour, also within this response
+                base = cached_series if cached_series is not None else series[:0]
+                series = base.merge(series)
+                series = series[series.ts >= (now - _COINGECKO_HISTORY_SECONDS) * 1000]
+                await asyncio.to_thread(self.cache.set, disk_key, series)
                 
-                # Return data for all requested timeframes (same data)
-                market_data = {}
-                for timeframe in timeframes:
-                    market_data[timeframe] = df.copy()
+                # Resample the hourly series to coarser timeframes where enough bars
+                # remain for the indicators; otherwise share the hourly frame read-only
+                df = series.to_dataframe()
+                market_data = {timeframe: self._resample_fallback(df, timeframe) for timeframe in timeframes}
                 
                 # Add market context
-                context = await self._get_market_context(symbol)
-                market_data['market_context'] = context
+                if context_task is None:
+                    context_task = self._get_market_context(symbol)
+                market_data['market_context'] = await context_task
                 
                 logger.info(f"✅ CoinGecko fallback: {symbol} data retrieved")
                 return market_data
@@ -145,38 +501,70 @@ class CryptoDataFetcher:
             logger.error(f"❌ CoinGecko fallback failed: {e}")
             return {}
     
+    @staticmethod
+    def _resample_fallback(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """Aggregate the hourly CoinGecko frame up to `timeframe` when that is meaningful"""
+        freq = _PANDAS_FREQ.get(timeframe)
+        if freq is None or pd.Timedelta(freq) <= _COINGECKO_BAR:
+            return df
+        resampled = df.resample(freq).agg(_OHLCV_AGG).dropna()
+        return resampled if len(resampled) >= _MIN_RESAMPLED_BARS else df
+    
+    async def _get_simple_price(self, coin_id: str):
+        """Get one coin's /simple/price entry, batching concurrent lookups into one request"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending_prices:
+            loop.call_later(_PRICE_BATCH_WINDOW, self._schedule_price_flush)
+        self._pending_prices.setdefault(coin_id, []).append(future)
+        return await future
+    
+    def _schedule_price_flush(self):
+        """Start the batched /simple/price request for everything queued so far"""
+        self._price_flush_task = asyncio.ensure_future(self._flush_prices())
+    
+    async def _flush_prices(self):
+        """Issue one /simple/price request and hand each waiter its coin's slice"""
+        pending, self._pending_prices = self._pending_prices, {}
+        
+        try:
+            data = await self._get_json(self._simple_price_url + ','.join(pending), None, timeout=5)
+            if not isinstance(data, dict):
+                data = {}
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        
+        for coin_id, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(data.get(coin_id))
+    
     async def _get_market_context(self, symbol: str) -> dict:
         """Get market context from CoinGecko (unrestricted)"""
+        cached = self._context_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
         try:
-            coin_map = {
-                'ETH/USDT': 'ethereum',
-                'BTC/USDT': 'bitcoin', 
-                'SOL/USDT': 'solana'
-            }
+            coin_id = _COIN_MAP.get(symbol, 'ethereum')
             
-            coin_id = coin_map.get(symbol, 'ethereum')
+            coin_data = await self._get_simple_price(coin_id)
             
-            url = f"{self.coingecko_base}/simple/price"
-            params = {
-                'ids': coin_id,
-                'vs_currencies': 'usd',
-                'include_24hr_change': 'true',
-                'include_24hr_vol': 'true'
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
-            data = response.json()
-            
-            if coin_id in data:
-                coin_data = data[coin_id]
+            if coin_data:
                 change_24h = coin_data.get('usd_24h_change', 0)
                 
-                return {
+                context = {
                     'price_change_24h': change_24h,
                     'volume_24h': coin_data.get('usd_24h_vol', 0),
                     'market_sentiment': 'bullish' if change_24h > 2 else ('bearish' if change_24h < -2 else 'neutral'),
                     'sentiment_strength': min(abs(change_24h) / 10, 1.0)
                 }
+                self._context_cache[symbol] = context
+                return context
             
             return {'market_sentiment': 'neutral', 'sentiment_strength': 0.5}
             
@@ -184,62 +572,116 @@ class CryptoDataFetcher:
             logger.error(f"❌ CoinGecko context failed: {e}")
             return {'market_sentiment': 'neutral', 'sentiment_strength': 0.5}
     
-    def get_current_price(self, symbol: str) -> dict:
-        """Get current price from available sources"""
+    async def get_current_price(self, symbol: str) -> dict:
+        """Get current price, batched with concurrent lookups for other symbols"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending_tickers:
+            loop.call_later(_TICKER_BATCH_WINDOW, self._schedule_ticker_flush)
+        self._pending_tickers.setdefault(symbol, []).append(future)
+        return await future
+    
+    def _schedule_ticker_flush(self):
+        """Start the batched ticker request for everything queued so far"""
+        self._ticker_flush_task = asyncio.ensure_future(self._flush_tickers())
+    
+    async def _flush_tickers(self):
+        """Fetch all queued symbols at once and hand each waiter its price"""
+        pending, self._pending_tickers = self._pending_tickers, {}
+        prices = await self.get_current_prices(list(pending))
+        for symbol, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(prices.get(symbol, {}))
+    
+    async def get_current_prices(self, symbols: list) -> dict:
+        """Get current prices for several symbols with one ticker request"""
         try:
-            # Try exchanges first
+            prices = {}
+            
+            # Try exchanges first, each for the symbols the previous ones did not return
             for exchange in self.exchanges:
+                pending = [symbol for symbol in symbols if symbol not in prices]
+                if not pending:
+                    break
+                circuit = self._circuits[exchange.id]
+                if circuit.is_open():
+                    continue
                 try:
-                    ticker = exchange.fetch_ticker(symbol)
-                    return {
-                        'price': ticker['last'],
-                        'change_24h': ticker['percentage'],
-                        'volume_24h': ticker['baseVolume'],
-                        'high_24h': ticker['high'],
-                        'low_24h': ticker['low'],
-                        'source': exchange.id
-                    }
-                except:
+                    # One unlisted symbol makes ccxt reject the whole batch with BadSymbol,
+                    # so only ask for symbols this exchange actually lists
+                    markets = exchange.markets or await exchange.load_markets()
+                    listed = [symbol for symbol in pending if symbol in markets]
+                    if not listed:
+                        continue
+                    tickers = await self._call_exchange(exchange, 'fetch_tickers', listed)
+                    circuit.record_success()
+                    for symbol in listed:
+                        ticker = tickers.get(symbol)
+                        if ticker:
+                            prices[symbol] = {
+                                'price': ticker['last'],
+                                'change_24h': ticker['percentage'],
+                                'volume_24h': ticker['baseVolume'],
+                                'high_24h': ticker['high'],
+                                'low_24h': ticker['low'],
+                                'source': exchange.id
+                            }
+                except ccxt.RateLimitExceeded as e:
+                    logger.warning(f"⚠️ {exchange.id} rate limited: {str(e)[:100]}")
+                    continue
+                except ccxt.NetworkError as e:
+                    circuit.record_failure()
+                    logger.warning(f"⚠️ {exchange.id} tickers failed: {str(e)[:100]}")
+                    continue
+                except ccxt.ExchangeError as e:
+                    logger.warning(f"⚠️ {exchange.id} tickers failed: {str(e)[:100]}")
                     continue
             
-            # Fallback to CoinGecko
-            coin_map = {'ETH/USDT': 'ethereum', 'BTC/USDT': 'bitcoin', 'SOL/USDT': 'solana'}
-            coin_id = coin_map.get(symbol, 'ethereum')
-            
-            url = f"{self.coingecko_base}/simple/price"
-            params = {'ids': coin_id, 'vs_currencies': 'usd', 'include_24hr_change': 'true'}
-            
-            response = requests.get(url, params=params, timeout=5)
-            data = response.json()
-            
-            if coin_id in data:
-                return {
-                    'price': data[coin_id]['usd'],
-                    'change_24h': data[coin_id].get('usd_24h_change', 0),
-                    'source': 'coingecko'
-                }
+            # Fallback to CoinGecko for anything the exchanges did not return; unmapped
+            # symbols are skipped rather than priced as the default coin
+            missing = [symbol for symbol in symbols if symbol not in prices and symbol in _COIN_MAP]
+            coin_data = await asyncio.gather(
+                *(self._get_simple_price(_COIN_MAP[symbol]) for symbol in missing),
+                return_exceptions=True
+            )
+            for symbol, data in zip(missing, coin_data):
+                if data and not isinstance(data, Exception):
+                    prices[symbol] = {
+                        'price': data['usd'],
+                        'change_24h': data.get('usd_24h_change', 0),
+                        'source': 'coingecko'
+                    }
             
-            return {}
+            return prices
             
         except Exception as e:
             logger.error(f"❌ All price sources failed: {e}")
             return {}
     
-    def get_anchor_candle(self, df: pd.DataFrame) -> dict:
-        """Get anchor candle (unchanged)"""
+    def get_anchor_candle(self, data) -> dict:
+        """Get anchor candle (latest completed bar), validated"""
         try:
-            if len(df) < 2:
+            # Only the last two bars matter; convert just those from a DataFrame
+            series = OHLCVSeries.from_dataframe(data.iloc[-2:]) if isinstance(data, pd.DataFrame) else data
+            if len(series) < 2:
                 return {}
                 
-            latest = df.iloc[-2]
+            row = np.array([series.open[-2], series.high[-2], series.low[-2], series.close[-2], series.volume[-2]],
+                           dtype=np.float64)
+            
+            # Reject incomplete or non-positive prices in one vectorized check
+            if not np.isfinite(row).all() or (row[:4] <= 0).any() or row[4] < 0:
+                return {}
             
+            o, h, l, c, v = row.tolist()
             return {
-                'timestamp': latest.name,
-                'open': float(latest['open']),
-                'high': float(latest['high']), 
-                'low': float(latest['low']),
-                'close': float(latest['close']),
-                'volume': float(latest['volume']),
+                'timestamp': pd.Timestamp(int(series.ts[-2]), unit='ms'),
+                'open': o,
+                'high': h,
+                'low': l,
+                'close': c,
+                'volume': v,
                 'validated': True
             }
             
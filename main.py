@@ -3,12 +3,20 @@ Professional Crypto Analysis Bot - Main Application
 Generates institutional-grade analysis reports for ETHUSDT and other crypto pairs
 """
 import asyncio
+import html
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+import orjson
 import pandas as pd  # Added import
 
 # Import modules with error handling
@@ -23,25 +31,64 @@ except ImportError as e:
     print("Make sure all modules are present in the same directory")
     sys.exit(1)
 
-# Setup professional logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Setup professional logging; records are queued and written by a background
+# listener thread so log I/O never blocks the event loop
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+# uvicorn re-imports this file as "main" after it already ran as __main__/__mp_main__,
+# so reuse the queue handler already on the root logger rather than orphaning a new queue
+_log_handler = next((h for h in logging.getLogger().handlers
+                     if isinstance(h, logging.handlers.QueueHandler)), None)
+if _log_handler is None:
+    _log_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    _log_handler.setFormatter(logging.Formatter('%(message)s'))  # full format is applied by _log_stream
+    logging.basicConfig(level=logging.INFO, handlers=[_log_handler])
+_log_listener = logging.handlers.QueueListener(_log_handler.queue, _log_stream)
 logger = logging.getLogger(__name__)
 
+_ANCHOR_CACHE_SIZE = 8
+# Dedicated workers for per-timeframe technical analysis
+_ANALYSIS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ta")
+_LEADER_LOCK_PATH = os.getenv('LEADER_LOCK_PATH', '/tmp/crypto-analysis-bot.lock')
+# The leader publishes its bot state here so follower workers report the same status
+_LEADER_STATE_PATH = os.getenv('LEADER_STATE_PATH', _LEADER_LOCK_PATH + '.state')
+_PROBE_TTL = 1.0  # seconds a /status or /health response is reused
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (serializes datetimes natively)"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+# Rendered probe responses: key -> (monotonic time built, ORJSONResponse)
+_probe_cache = {}
+
+def _cached_response(key: str, build, ttl: float = _PROBE_TTL) -> ORJSONResponse:
+    """Serve a recently rendered response so probe bursts skip rebuilding it"""
+    now = time.monotonic()
+    hit = _probe_cache.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    response = ORJSONResponse(content=build())
+    _probe_cache[key] = (now, response)
+    return response
+
 class ProfessionalCryptoAnalysisBot:
     def __init__(self):
         """Initialize the professional analysis bot"""
         try:
             logger.info("🚀 Initializing Professional Crypto Analysis Bot...")
             self.config = AnalysisConfig()
-            self.data_fetcher = CryptoDataFetcher(self.config.EXCHANGE)
+            self.data_fetcher = CryptoDataFetcher(self.config.DATA_EXCHANGES)
             self.technical_analysis = ProfessionalAnalysis()
             self.report_formatter = ProfessionalReportFormatter(self.config)
             self.telegram = AnalysisTelegramController(self.config)
             self.is_running = False
             self.last_analysis_time = None
+            # Set on the leader worker; state changes are then written here for followers
+            self.state_path = None
+            # Anchor candles keyed by (symbol, last 15m bar); reused until a new bar opens
+            self._anchor_cache = OrderedDict()
             logger.info("✅ Professional Analysis Bot initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize bot: {e}")
@@ -57,29 +104,47 @@ class ProfessionalCryptoAnalysisBot:
             timeframes = ['15m', '1h', '4h', '1d']
             market_data = await self.data_fetcher.get_market_data(symbol, timeframes)
             if not market_data:
-                return f"❌ Unable to fetch market data for {symbol}"
+                return html.escape(f"❌ Unable to fetch market data for {symbol}")
             # Get current price information
-            current_price_info = self.data_fetcher.get_current_price(symbol)
+            current_price_info = await self.data_fetcher.get_current_price(symbol)
             # Get anchor candle (latest completed candle)
             anchor_candle = {}
-            if '15m' in market_data and isinstance(market_data['15m'], pd.DataFrame):
-                anchor_candle = self.data_fetcher.get_anchor_candle(market_data['15m'])
+            df15 = market_data.get('15m')
+            if isinstance(df15, pd.DataFrame) and not df15.empty:
+                key = (symbol, df15.index[-1])
+                anchor_candle = self._anchor_cache.get(key)
+                if anchor_candle is None:
+                    anchor_candle = self.data_fetcher.get_anchor_candle(df15)
+                    self._anchor_cache[key] = anchor_candle
+                    if len(self._anchor_cache) > _ANCHOR_CACHE_SIZE:
+                        self._anchor_cache.popitem(last=False)
+                else:
+                    self._anchor_cache.move_to_end(key)
             # Perform technical analysis for each timeframe
-            analysis_results = {}
+            valid = []
             for timeframe, df in market_data.items():
                 # Skip market_context dict
                 if timeframe == 'market_context':
                     continue
                 # Ensure type is DataFrame and not empty
                 if isinstance(df, pd.DataFrame) and not df.empty:
-                    try:
-                        analysis_results[timeframe] = self.technical_analysis.analyze_timeframe(df, timeframe)
-                        logger.info(f"✅ Analysis completed for {timeframe}")
-                    except Exception as e:
-                        logger.error(f"❌ Analysis failed for {timeframe}: {e}")
-                        continue
+                    valid.append((timeframe, df))
                 else:
                     logger.warning(f"⚠️ Skipping {timeframe}: not a valid DataFrame")
+            # Run the timeframes concurrently on the analysis pool, off the event loop
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(_ANALYSIS_POOL, self.technical_analysis.analyze_timeframe, df, timeframe)
+                  for timeframe, df in valid),
+                return_exceptions=True
+            )
+            analysis_results = {}
+            for (timeframe, _), result in zip(valid, results):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Analysis failed for {timeframe}: {result}")
+                    continue
+                analysis_results[timeframe] = result
+                logger.info(f"✅ Analysis completed for {timeframe}")
             # Generate professional report
             professional_report = self.report_formatter.generate_analysis_report(
                 symbol=symbol,
@@ -89,27 +154,31 @@ class ProfessionalCryptoAnalysisBot:
                 current_price_info=current_price_info
             )
             self.last_analysis_time = datetime.now()
+            self._publish_state()
             logger.info(f"✅ Professional analysis generated for {symbol}")
             return professional_report
         except Exception as e:
             logger.error(f"❌ Error generating analysis: {e}")
-            return f"❌ Analysis generation failed for {symbol}: {str(e)}"
+            return html.escape(f"❌ Analysis generation failed for {symbol}: {str(e)}")
 
     async def run_automated_analysis(self):
         """Run automated analysis loop"""
         try:
             logger.info("🔄 Starting automated analysis monitoring...")
             self.is_running = True
+            self._publish_state()
             while self.is_running:
                 try:
-                    # Generate analysis for primary symbol
-                    report = await self.generate_complete_analysis()
+                    # Generate analyses for all configured symbols in parallel
+                    symbols = self.config.SYMBOLS or [self.config.DEFAULT_SYMBOL]
+                    reports = await asyncio.gather(*(self.generate_complete_analysis(sym) for sym in symbols))
                     # Send via Telegram if configured
                     if self.telegram.initialized:
-                        await self.telegram.send_analysis_report(report)
+                        await asyncio.gather(*(self.telegram.send_analysis_report(report) for report in reports))
                     else:
                         logger.info("📊 Analysis generated (Telegram not configured)")
-                        logger.info(f"Preview: {report[:200]}...")
+                        for report in reports:
+                            logger.info(f"Preview: {report[:200]}...")
                     # Wait for next analysis cycle (60 minutes)
                     await asyncio.sleep(self.config.ANALYSIS_INTERVAL * 60)
                 except Exception as e:
@@ -125,42 +194,87 @@ class ProfessionalCryptoAnalysisBot:
     def stop(self):
         """Stop the analysis bot"""
         self.is_running = False
+        self._publish_state()
         logger.info("🛑 Professional Analysis Bot stopped")
 
+    def state(self) -> dict:
+        """Running/Telegram/last-analysis state reported by the status endpoints"""
+        return {
+            "bot_running": self.is_running,
+            "telegram_configured": self.telegram.initialized,
+            "last_analysis": self.last_analysis_time
+        }
+
+    def _publish_state(self):
+        """Write the current state for follower workers (leader only)"""
+        if not self.state_path:
+            return
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(self.state()))
+            os.replace(tmp_path, self.state_path)  # Readers never see a partial file
+        except OSError as e:
+            logger.warning(f"⚠️ Could not publish bot state: {e}")
+
 # Global bot instance
 analysis_bot = None
+# Lock file held by the worker that runs streams, Telegram and the analysis loop
+_leader_lock = None
+
+def _bot_state() -> dict:
+    """Bot state as the leader sees it, read from its state file on follower workers"""
+    bot = analysis_bot
+    if bot is None:
+        return {"bot_running": False, "telegram_configured": False, "last_analysis": None}
+    if not bot.state_path:
+        try:
+            with open(_LEADER_STATE_PATH, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            pass  # Leader has not published yet; fall back to this worker's view
+    return bot.state()
+
+def _acquire_leader_lock() -> bool:
+    """Elect one leader among uvicorn workers via a non-blocking flock"""
+    global _leader_lock
+    try:
+        import fcntl
+    except ImportError:
+        return True  # No flock on this platform; assume a single worker
+    lock_file = open(_LEADER_LOCK_PATH, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _leader_lock = lock_file  # Held (and the lock kept) for the process lifetime
+    return True
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """FastAPI lifespan management"""
     global analysis_bot
     # Startup sequence
+    _log_listener.start()
     logger.info("🚀 Starting Professional Crypto Analysis Bot...")
     try:
         # Initialize bot
         analysis_bot = ProfessionalCryptoAnalysisBot()
-        # Initialize Telegram if token provided
-        telegram_ready = False
-        if (analysis_bot.config.TELEGRAM_TOKEN and 
-            analysis_bot.config.TELEGRAM_TOKEN != 'YOUR_TELEGRAM_BOT_TOKEN_HERE'):
-            telegram_ready = await analysis_bot.telegram.initialize()
-            if telegram_ready:
-                await analysis_bot.telegram.start_webhook(analysis_bot.config.WEBHOOK_URL)
-                logger.info("✅ Telegram integration active")
-            else:
-                logger.warning("⚠️ Telegram initialization failed - running without notifications")
+        # With several workers only the leader warms connections and runs streams,
+        # Telegram and the analysis loop
+        if _acquire_leader_lock():
+            analysis_bot.state_path = _LEADER_STATE_PATH
+            analysis_bot._publish_state()  # Replace any state left by a previous leader
+            # Warm exchange connections before the first analysis
+            await analysis_bot.data_fetcher.warmup()
+            await _start_background_jobs(analysis_bot)
+            logger.info("✅ Professional Analysis Bot fully operational")
         else:
-            logger.warning("⚠️ No Telegram token provided - running in analysis-only mode")
-        # Generate initial analysis
-        logger.info("📊 Generating initial market analysis...")
-        initial_report = await analysis_bot.generate_complete_analysis()
-        if telegram_ready:
-            await analysis_bot.telegram.send_analysis_report(initial_report)
-        # Start automated analysis in background
-        asyncio.create_task(analysis_bot.run_automated_analysis())
-        logger.info("✅ Professional Analysis Bot fully operational")
+            logger.info("ℹ️ Follower worker - serving HTTP requests only")
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
+        _log_listener.stop()  # flush queued records before exiting
         raise
     yield  # Application runs here
     # Shutdown sequence
@@ -169,10 +283,41 @@ async def lifespan(app: FastAPI):
         analysis_bot.stop()
         if hasattr(analysis_bot, 'telegram'):
             await analysis_bot.telegram.stop_webhook()
+        await analysis_bot.data_fetcher.close()
+    _ANALYSIS_POOL.shutdown(wait=False)
+    _log_listener.stop()
+
+async def _start_background_jobs(bot: ProfessionalCryptoAnalysisBot):
+    """Start candle streams, Telegram and the automated analysis loop (leader only)"""
+    # Stream candles over websockets so analysis reads from memory
+    await bot.data_fetcher.start_streams(
+        bot.config.SYMBOLS,
+        bot.config.INTRADAY_TIMEFRAMES + bot.config.SWING_TIMEFRAMES
+    )
+    # Initialize Telegram if token provided
+    telegram_ready = False
+    if (bot.config.TELEGRAM_TOKEN and 
+        bot.config.TELEGRAM_TOKEN != 'YOUR_TELEGRAM_BOT_TOKEN_HERE'):
+        telegram_ready = await bot.telegram.initialize()
+        if telegram_ready:
+            await bot.telegram.start_webhook(bot.config.WEBHOOK_URL)
+            logger.info("✅ Telegram integration active")
+        else:
+            logger.warning("⚠️ Telegram initialization failed - running without notifications")
+    else:
+        logger.warning("⚠️ No Telegram token provided - running in analysis-only mode")
+    # Generate initial analysis
+    logger.info("📊 Generating initial market analysis...")
+    initial_report = await bot.generate_complete_analysis()
+    if telegram_ready:
+        await bot.telegram.send_analysis_report(initial_report)
+    # Start automated analysis in background
+    asyncio.create_task(bot.run_automated_analysis())
 
 # FastAPI application
 app = FastAPI(
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="Professional Crypto Analysis Bot",
     description="Institutional-grade cryptocurrency analysis with professional formatting",
     version="1.0.0"
@@ -181,13 +326,14 @@ app = FastAPI(
 @app.get("/")
 async def root():
     """Health check and bot status"""
+    state = _bot_state()
     return {
         "status": "✅ Professional Crypto Analysis Bot Active",
         "description": "Institutional-grade cryptocurrency analysis",
-        "timestamp": datetime.now().isoformat(),
-        "bot_running": analysis_bot.is_running if analysis_bot else False,
-        "last_analysis": analysis_bot.last_analysis_time.isoformat() if analysis_bot and analysis_bot.last_analysis_time else None,
-        "telegram_enabled": analysis_bot.telegram.initialized if analysis_bot else False
+        "timestamp": datetime.now(),
+        "bot_running": state["bot_running"],
+        "last_analysis": state["last_analysis"],
+        "telegram_enabled": state["telegram_configured"]
     }
 
 @app.get("/status")
@@ -195,16 +341,23 @@ async def detailed_status():
     """Detailed bot status"""
     if not analysis_bot:
         return {"error": "Bot not initialized"}
+    return _cached_response('status', _build_status)
+
+def _build_status() -> dict:
+    """Build the /status payload"""
+    config = analysis_bot.config
+    state = _bot_state()
+    now = datetime.now()
     return {
-        "bot_status": "running" if analysis_bot.is_running else "stopped", 
-        "primary_symbol": analysis_bot.config.DEFAULT_SYMBOL,
-        "analysis_interval": f"{analysis_bot.config.ANALYSIS_INTERVAL} minutes",
-        "supported_symbols": analysis_bot.config.SYMBOLS,
-        "telegram_configured": analysis_bot.telegram.initialized,
-        "last_analysis": analysis_bot.last_analysis_time.isoformat() if analysis_bot.last_analysis_time else "None",
-        "next_analysis": f"~{60 - datetime.now().minute} minutes",
-        "exchange": analysis_bot.config.EXCHANGE,
-        "timestamp": datetime.now().isoformat()
+        "bot_status": "running" if state["bot_running"] else "stopped", 
+        "primary_symbol": config.DEFAULT_SYMBOL,
+        "analysis_interval": f"{config.ANALYSIS_INTERVAL} minutes",
+        "supported_symbols": config.SYMBOLS,
+        "telegram_configured": state["telegram_configured"],
+        "last_analysis": state["last_analysis"] or "None",
+        "next_analysis": f"~{60 - now.minute} minutes",
+        "exchange": config.EXCHANGE,
+        "timestamp": now
     }
 
 @app.get("/analyze/{symbol}")
@@ -222,7 +375,7 @@ async def manual_analysis(symbol: str):
         return {
             "symbol": symbol_formatted,
             "analysis": report,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "type": "manual_request"
         }
     except Exception as e:
@@ -240,20 +393,24 @@ async def telegram_webhook(request: Request):
     try:
         update_data = await request.json()
         # Process Telegram update if needed
-        return JSONResponse({"status": "ok"})
+        return ORJSONResponse({"status": "ok"})
     except Exception as e:
         logger.error(f"❌ Telegram webhook error: {e}")
-        return JSONResponse({"error": str(e)}, status_code=500)
+        return ORJSONResponse({"error": str(e)}, status_code=500)
 
 @app.get("/health")
 async def health_check():
     """Simple health check for monitoring"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return _cached_response('health', lambda: {"status": "healthy", "timestamp": datetime.now()})
 
 if __name__ == "__main__":
     import uvicorn
-    import os
     # Get port from environment (required for Render)
     port = int(os.getenv('PORT', 8000))
+    _log_listener.start()
     logger.info(f"🚀 Starting Professional Analysis Bot on port {port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    _log_listener.stop()  # Flush; each worker's lifespan runs its own listener on the shared queue
+    # uvloop/httptools come with uvicorn[standard]; workers need the app as an import string.
+    # One worker unless WEB_CONCURRENCY asks for more (followers only serve HTTP)
+    workers = int(os.getenv('WEB_CONCURRENCY', 1))
+    uvicorn.run("main:app", host="0.0.0.0", port=port, loop="uvloop", http="httptools", workers=workers)
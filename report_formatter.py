@@ -1,303 +1,396 @@
 """
 Professional report formatter for cryptocurrency analysis
 """
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+import html
+from typing import NamedTuple, Protocol, Sequence, Tuple
 import logging
+from types import MappingProxyType
+import numpy as np
+from cachetools import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Numba is optional; without it the signal kernels below run as plain Python
+from _njit import njit, HAS_NUMBA as _HAS_NUMBA
+
+# Signal direction codes (+1 bullish, -1 bearish, 0 neutral/unknown), in
+# (trend, rsi, macd, obv) order
+_TREND_CODE = {'bullish': 1, 'strong_bullish': 1, 'bearish': -1, 'strong_bearish': -1}
+_RSI_CODE = {'bullish': 1, 'oversold': 1, 'bearish': -1, 'overbought': -1}
+_MACD_CODE = {'bullish': 1, 'bearish': -1}
+_OBV_CODE = {'accumulation': 1, 'distribution': -1}
+_SIGNAL_WEIGHTS = np.array([0.15, 0.125, 0.125, 0.1])
+
+# Weighted score contributions per condition, for hash-probe scoring without numba
+_TREND_SCORE = MappingProxyType({k: v * 0.15 for k, v in _TREND_CODE.items()})
+_RSI_SCORE = MappingProxyType({k: v * 0.125 for k, v in _RSI_CODE.items()})
+_MACD_SCORE = MappingProxyType({k: v * 0.125 for k, v in _MACD_CODE.items()})
+_OBV_SCORE = MappingProxyType({k: v * 0.1 for k, v in _OBV_CODE.items()})
+
+# Shared read-only default for missing indicator sub-dicts
+_EMPTY = MappingProxyType({})
+
+# Per-symbol caches are keyed by caller-supplied symbols (/analyze/{symbol}), so bound them
+_SYMBOL_CACHE_SIZE = 64
+
+class _Signals(NamedTuple):
+    """One timeframe's analysis, destructured once per report"""
+    trend: str
+    rsi_value: float
+    rsi_condition: str
+    macd_condition: str
+    obv_trend: str
+    support: Tuple[float, ...]
+    resistance: Tuple[float, ...]
+
+def _unpack(analysis: dict) -> _Signals:
+    """Walk an analysis dict once; missing sections fall back to neutral defaults"""
+    rsi = analysis.get('rsi') or _EMPTY
+    macd = analysis.get('macd') or _EMPTY
+    obv = analysis.get('obv') or _EMPTY
+    sr = analysis.get('support_resistance') or _EMPTY
+    return _Signals(
+        analysis.get('trend', 'neutral'),
+        rsi.get('value', 0),
+        rsi.get('condition', 'neutral'),
+        macd.get('condition', 'neutral'),
+        obv.get('trend', 'neutral'),
+        tuple(sr.get('support', ())),
+        tuple(sr.get('resistance', ())),
+    )
+
+def _encode_signals(sig: _Signals) -> np.ndarray:
+    """Encode trend/RSI/MACD/OBV conditions as an int8 direction array"""
+    return np.array([
+        _TREND_CODE.get(sig.trend, 0),
+        _RSI_CODE.get(sig.rsi_condition, 0),
+        _MACD_CODE.get(sig.macd_condition, 0),
+        _OBV_CODE.get(sig.obv_trend, 0),
+    ], dtype=np.int8)
+
+def _flatten_signals(sig: _Signals, tf: str, ctx: dict) -> None:
+    """Copy one timeframe's RSI/MACD/OBV readings into flat template keys"""
+    ctx['rsi_' + tf] = sig.rsi_value
+    ctx['rsi_' + tf + '_condition'] = sig.rsi_condition
+    ctx['macd_' + tf] = sig.macd_condition.title()
+    ctx['obv_' + tf] = sig.obv_trend.title()
+
+def _score_signals(sig: _Signals) -> float:
+    """Weighted sentiment around a 0.5 base via one dict probe per signal, clamped to 0-1"""
+    score = (0.5
+             + _TREND_SCORE.get(sig.trend, 0.0)
+             + _RSI_SCORE.get(sig.rsi_condition, 0.0)
+             + _MACD_SCORE.get(sig.macd_condition, 0.0)
+             + _OBV_SCORE.get(sig.obv_trend, 0.0))
+    return 0.0 if score < 0 else 1.0 if score > 1 else score
+
+@njit(cache=True)
+def _sentiment_kernel(codes, weights):
+    """Weighted sentiment around a 0.5 base, clamped to 0-1"""
+    score = 0.5
+    for i in range(codes.shape[0]):
+        score += codes[i] * weights[i]
+    return max(0.0, min(1.0, score))
+
+@njit(cache=True)
+def _action_kernel(codes):
+    """Majority vote over trend/RSI/MACD as a signed sum: 1 BUY, -1 SELL, 0 HOLD"""
+    sig = codes[0] + codes[1] + codes[2]
+    return 1 if sig > 0 else -1 if sig < 0 else 0
+
+def warm_up_kernels() -> None:
+    """Run the njit report kernels once on neutral signals so they compile ahead of the first report"""
+    codes = _encode_signals(_unpack(_EMPTY))
+    _sentiment_kernel(codes, _SIGNAL_WEIGHTS)
+    _action_kernel(codes)
+
+def _action_from_signals(sig: _Signals) -> str:
+    """Majority vote over trend/RSI/MACD via one dict probe per signal"""
+    vote = (_TREND_CODE.get(sig.trend, 0)
+            + _RSI_CODE.get(sig.rsi_condition, 0)
+            + _MACD_CODE.get(sig.macd_condition, 0))
+    return 'BUY' if vote > 0 else 'SELL' if vote < 0 else 'HOLD'
+
+_ACTIONS = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+
+@lru_cache(maxsize=2048)
+def _levels_for(price: float, intraday_action: str, swing_action: str) -> Tuple[float, float, float, float, float, float]:
+    """SL/TP/R:R for both horizons; pure in its inputs, so repeated closes hit the cache"""
+    # Intraday levels (tighter stops)
+    if intraday_action == 'BUY':
+        intraday_sl = price * 0.985  # 1.5% SL
+        intraday_tp = price * 1.030  # 3% TP
+    else:  # SELL or HOLD
+        intraday_sl = price * 1.015  # 1.5% SL  
+        intraday_tp = price * 0.970  # 3% TP
+    
+    intraday_rr = abs((intraday_tp - price) / (intraday_sl - price)) if intraday_sl != price else 1.0
+    
+    # Swing levels (wider stops)
+    if swing_action == 'BUY':
+        swing_sl = price * 0.95   # 5% SL
+        swing_tp = price * 1.10   # 10% TP  
+    else:  # SELL or HOLD
+        swing_sl = price * 1.05   # 5% SL
+        swing_tp = price * 0.90   # 10% TP
+        
+    swing_rr = abs((swing_tp - price) / (swing_sl - price)) if swing_sl != price else 1.0
+    
+    return intraday_sl, intraday_tp, intraday_rr, swing_sl, swing_tp, swing_rr
+
+# Narrative buckets. Lower/upper cut-offs are strict on the outside (x < -5, x > 5),
+# so bucket = bisect_right(lower) + bisect_left(upper) keeps the boundary values central
+_CHANGE_LOWER = (-5.0, -2.0)
+_CHANGE_UPPER = (2.0, 5.0)
+_CHANGE_TMPL = (
+    "• <b>Heavy selling pressure</b> → {:.1f}% daily decline",
+    "• <b>Mild bearish pressure</b> → {:.1f}% daily dip",
+    "• <b>Consolidation phase</b> → {:.1f}% daily range",
+    "• <b>Moderate bullish bias</b> → +{:.1f}% daily gains",
+    "• <b>Strong bullish momentum</b> → +{:.1f}% daily surge",
+)
+_SENT_LOWER = (0.35,)
+_SENT_UPPER = (0.65,)
+_SENT_NARRATIVE = (
+    "• <b>Caution warranted</b> → Multiple bearish signals present",
+    "• <b>Mixed signals</b> → Market in transition phase",
+    "• <b>Market confidence high</b> → Multiple bullish confluences",
+)
+
+# Report layout, built once at import and sent with Telegram's HTML parse mode. The per-call header/footer stamps live in
+# _REPORT_TMPL; everything derived from market inputs is in _REPORT_BODY so it
+# can be cached and re-stamped while those inputs are unchanged
+_REPORT_TMPL = (
+    "<b>{symbol_clean} | Professional Analysis | {timestamp}</b>\n\n"
+    "{body}"
+    "<i>Analysis generated at {generated_at} | Next update in 60 minutes</i>"
+)
+
+_REPORT_BODY = (
+    "📊 <b>Anchor Candle</b> ({anchor_time})\n"
+    "<b>O:</b> {open:.2f} | <b>H:</b> {high:.2f} | "
+    "<b>L:</b> {low:.2f} | <b>C:</b> {close:.2f}\n\n"
+    
+    # Trading matrix (using text formatting instead of ASCII table to avoid backtick issues)
+    "📈 <b>TRADING MATRIX</b>\n"
+    "<b>Intraday (15m-1h):</b> {intraday_action} | "
+    "Entry: {intraday_entry:.0f} | "
+    "SL: {intraday_sl:.0f} | "
+    "TP: {intraday_tp:.0f} | "
+    "R:R: {intraday_rr:.1f} | "
+    "Leverage: {intraday_leverage}\n"
+    "<b>Swing (4h-1d):</b> {swing_action} | "
+    "Entry: {swing_entry:.0f} | "
+    "SL: {swing_sl:.0f} | "
+    "TP: {swing_tp:.0f} | "
+    "R:R: {swing_rr:.1f} | "
+    "Leverage: {swing_leverage}\n\n"
+    
+    "🔑 <b>KEY LEVELS</b>\n"
+    "<b>🔑 Support:</b> {support}\n"
+    "<b>⚔️ Resistance:</b> {resistance}\n\n"
+    
+    "⚡ <b>TECHNICAL SIGNALS</b>\n"
+    "<b>RSI (15m):</b> ~{rsi_15m:.0f} ({rsi_15m_condition})\n"
+    "<b>RSI (1D):</b> ~{rsi_1d:.0f} ({rsi_1d_condition})\n"
+    "<b>MACD (15m):</b> {macd_15m} crossover\n"
+    "<b>MACD (1D):</b> {macd_1d} momentum\n"
+    "<b>OBV:</b> {obv_15m} pattern\n\n"
+    
+    "📊 <b>SENTIMENT ANALYSIS</b>\n"
+    "<b>Short-term (15m–1h):</b> {sentiment_short:.2f}\n"
+    "<b>Long-term (4h–1d):</b> {sentiment_long:.2f}\n\n"
+    
+    "🎯 <b>MARKET DRIVERS</b>\n"
+    "{narrative}\n\n"
+    
+    "🛡️ <b>RISK MANAGEMENT</b>\n"
+    "• Risk <b>1–2%</b> of capital per trade\n"
+    "• Move SL to <b>breakeven</b> once <b>+1%</b> in profit\n"
+    "• Monitor <b>volume divergence</b> for early exits\n"
+    "• Adjust position size based on <b>volatility</b>\n\n"
+    
+    "⚠️ <b>Disclaimer:</b> Educational analysis only. Not financial advice. Manage your own risk.\n\n"
+    "---\n"
+)
+
+class _ConfigP(Protocol):
+    """The AnalysisConfig settings the formatter reads"""
+    INTRADAY_LEVERAGE: int
+    SWING_LEVERAGE: int
+
 class ProfessionalReportFormatter:
-    def __init__(self, config):
+    def __init__(self, config: _ConfigP):
         self.config = config
+        # Per-config invariants, computed once instead of on every report
+        self._intra_lev = f"{config.INTRADAY_LEVERAGE}x"
+        self._swing_lev = f"{config.SWING_LEVERAGE}x"
+        self._symbol_clean_cache: LRUCache = LRUCache(maxsize=_SYMBOL_CACHE_SIZE)
+        # Last rendered body per symbol: symbol -> (input key, body)
+        self._body_cache: LRUCache = LRUCache(maxsize=_SYMBOL_CACHE_SIZE)
         
     def generate_analysis_report(self, symbol: str, market_data: dict, analysis: dict, anchor_candle: dict, current_price_info: dict) -> str:
         """Generate complete professional analysis report"""
         try:
-            timestamp = datetime.now().strftime('%d %b %Y – %H:%M %Z')
-            symbol_clean = symbol.replace('/', '')
-            
-            # Get analysis data for both timeframes
-            intraday_analysis = analysis.get('15m', {})
-            swing_analysis = analysis.get('1d', {})
-            
-            # Calculate trade levels
-            trade_levels = self._calculate_trade_levels(anchor_candle, intraday_analysis, swing_analysis)
-            
-            # Generate sentiment score
-            sentiment = self._calculate_sentiment_score(intraday_analysis, swing_analysis)
-            
-            # Build report sections
-            header = f"**{symbol_clean} | Professional Analysis | {timestamp}**\n\n"
-            
-            anchor_section = (
-                f"📊 **Anchor Candle** ({anchor_candle.get('timestamp', datetime.now()).strftime('%H:%M')})\n"
-                f"**O:** {anchor_candle.get('open', 0):.2f} | **H:** {anchor_candle.get('high', 0):.2f} | "
-                f"**L:** {anchor_candle.get('low', 0):.2f} | **C:** {anchor_candle.get('close', 0):.2f}\n\n"
-            )
-            
-            # Trading matrix (using text formatting instead of ASCII table to avoid backtick issues)
-            matrix_section = (
-                f"📈 **TRADING MATRIX**\n"
-                f"**Intraday (15m-1h):** {trade_levels['intraday']['action']} | "
-                f"Entry: {trade_levels['intraday']['entry']:.0f} | "
-                f"SL: {trade_levels['intraday']['sl']:.0f} | "
-                f"TP: {trade_levels['intraday']['tp']:.0f} | "
-                f"R:R: {trade_levels['intraday']['rr']} | "
-                f"Leverage: {self.config.INTRADAY_LEVERAGE}x\n"
-                f"**Swing (4h-1d):** {trade_levels['swing']['action']} | "
-                f"Entry: {trade_levels['swing']['entry']:.0f} | "
-                f"SL: {trade_levels['swing']['sl']:.0f} | "
-                f"TP: {trade_levels['swing']['tp']:.0f} | "
-                f"R:R: {trade_levels['swing']['rr']} | "
-                f"Leverage: {self.config.SWING_LEVERAGE}x\n\n"
-            )
-            
-            levels_section = (
-                f"🔑 **KEY LEVELS**\n"
-                f"**🔑 Support:** {self._format_levels(intraday_analysis.get('support_resistance', {}).get('support', []))}\n"
-                f"**⚔️ Resistance:** {self._format_levels(intraday_analysis.get('support_resistance', {}).get('resistance', []))}\n\n"
-            )
-            
-            signals_section = (
-                f"⚡ **TECHNICAL SIGNALS**\n"
-                f"**RSI (15m):** ~{intraday_analysis.get('rsi', {}).get('value', 0):.0f} ({intraday_analysis.get('rsi', {}).get('condition', 'neutral')})\n"
-                f"**RSI (1D):** ~{swing_analysis.get('rsi', {}).get('value', 0):.0f} ({swing_analysis.get('rsi', {}).get('condition', 'neutral')})\n"
-                f"**MACD (15m):** {intraday_analysis.get('macd', {}).get('condition', 'neutral').title()} crossover\n"
-                f"**MACD (1D):** {swing_analysis.get('macd', {}).get('condition', 'neutral').title()} momentum\n"
-                f"**OBV:** {intraday_analysis.get('obv', {}).get('trend', 'neutral').title()} pattern\n\n"
-            )
-            
-            sentiment_section = (
-                f"📊 **SENTIMENT ANALYSIS**\n"
-                f"**Short-term (15m–1h):** {sentiment['short_term']:.2f}\n"
-                f"**Long-term (4h–1d):** {sentiment['long_term']:.2f}\n\n"
-            )
-            
-            narrative_section = (
-                f"🎯 **MARKET DRIVERS**\n"
-                f"{self._generate_market_narrative(current_price_info, sentiment)}\n\n"
-            )
-            
-            risk_section = (
-                f"🛡️ **RISK MANAGEMENT**\n"
-                f"• Risk **1–2%** of capital per trade\n"
-                f"• Move SL to **breakeven** once **+1%** in profit\n"
-                f"• Monitor **volume divergence** for early exits\n"
-                f"• Adjust position size based on **volatility**\n\n"
-            )
-            
-            footer = (
-                f"⚠️ **Disclaimer:** Educational analysis only. Not financial advice. Manage your own risk.\n\n"
-                f"---\n"
-                f"*Analysis generated at {datetime.now().strftime('%H:%M:%S %Z')} | Next update in 60 minutes*"
+            now = datetime.now()
+            timestamp = now.strftime('%d %b %Y – %H:%M %Z')
+            symbol_clean = self._symbol_clean_cache.get(symbol)
+            if symbol_clean is None:
+                symbol_clean = self._symbol_clean_cache.setdefault(symbol, html.escape(symbol.replace('/', '')))
+            
+            # Destructure analysis data for both timeframes once
+            intraday = _unpack(analysis.get('15m') or _EMPTY)
+            swing = _unpack(analysis.get('1d') or _EMPTY)
+            anchor_time = (anchor_candle.get('timestamp') or now).strftime('%H:%M')
+            change_24h = current_price_info.get('change_24h') or 0  # Tickers may report null
+            
+            # Everything below the header depends only on these inputs
+            key = (anchor_time, anchor_candle.get('open', 0), anchor_candle.get('high', 0),
+                   anchor_candle.get('low', 0), anchor_candle.get('close', 0), intraday, swing, change_24h)
+            cached = self._body_cache.get(symbol)
+            if cached is not None and cached[0] == key:
+                body = cached[1]
+            else:
+                body = self._render_body(anchor_time, anchor_candle, intraday, swing, current_price_info)
+                self._body_cache[symbol] = (key, body)
+            
+            return _REPORT_TMPL.format(
+                symbol_clean=symbol_clean,
+                timestamp=timestamp,
+                body=body,
+                generated_at=now.strftime('%H:%M:%S %Z')
             )
             
-            # Combine all sections
-            report = header + anchor_section + matrix_section + levels_section + signals_section + sentiment_section + narrative_section + risk_section + footer
-            
-            return report
-            
         except Exception as e:
             logger.error(f"Error generating analysis report: {e}")
-            return f"❌ Error generating analysis for {symbol}: {str(e)}"
+            return html.escape(f"❌ Error generating analysis for {symbol}: {str(e)}")
     
-    def _calculate_trade_levels(self, anchor_candle: dict, intraday: dict, swing: dict) -> dict:
+    def _render_body(self, anchor_time: str, anchor_candle: dict, intraday: _Signals, swing: _Signals, price_info: dict) -> str:
+        """Render the input-dependent report body"""
+        fmt_levels = self._format_levels
+        # Calculate trade levels
+        trade_levels = self._calculate_trade_levels(anchor_candle, intraday, swing)
+        
+        # Generate sentiment score
+        sentiment = self._calculate_sentiment_score(intraday, swing)
+        
+        # Fill the body template from one flat context dict
+        intraday_levels = trade_levels['intraday']
+        swing_levels = trade_levels['swing']
+        ctx = {
+            'anchor_time': anchor_time,
+            'open': anchor_candle.get('open', 0),
+            'high': anchor_candle.get('high', 0),
+            'low': anchor_candle.get('low', 0),
+            'close': anchor_candle.get('close', 0),
+            'intraday_action': intraday_levels['action'],
+            'intraday_entry': intraday_levels['entry'],
+            'intraday_sl': intraday_levels['sl'],
+            'intraday_tp': intraday_levels['tp'],
+            'intraday_rr': intraday_levels['rr'],
+            'intraday_leverage': self._intra_lev,
+            'swing_action': swing_levels['action'],
+            'swing_entry': swing_levels['entry'],
+            'swing_sl': swing_levels['sl'],
+            'swing_tp': swing_levels['tp'],
+            'swing_rr': swing_levels['rr'],
+            'swing_leverage': self._swing_lev,
+            'support': fmt_levels(intraday.support),
+            'resistance': fmt_levels(intraday.resistance),
+            'sentiment_short': sentiment['short_term'],
+            'sentiment_long': sentiment['long_term'],
+            'narrative': self._generate_market_narrative(price_info, sentiment),
+        }
+        _flatten_signals(intraday, '15m', ctx)
+        _flatten_signals(swing, '1d', ctx)
+        
+        return _REPORT_BODY.format_map(ctx)
+    
+    def _calculate_trade_levels(self, anchor_candle: dict, intraday: _Signals, swing: _Signals) -> dict:
         """Calculate professional trade entry, SL, TP levels"""
-        try:
-            current_price = anchor_candle.get('close', 0)
-            if current_price == 0:
-                current_price = 1000  # Default fallback
-            
-            # Intraday levels (tighter stops)
-            intraday_action = self._determine_action(intraday)
-            if intraday_action == 'BUY':
-                intraday_sl = current_price * 0.985  # 1.5% SL
-                intraday_tp = current_price * 1.030  # 3% TP
-            else:  # SELL or HOLD
-                intraday_sl = current_price * 1.015  # 1.5% SL  
-                intraday_tp = current_price * 0.970  # 3% TP
-            
-            intraday_rr = abs((intraday_tp - current_price) / (intraday_sl - current_price)) if intraday_sl != current_price else 1.0
-            
-            # Swing levels (wider stops)
-            swing_action = self._determine_action(swing)
-            if swing_action == 'BUY':
-                swing_sl = current_price * 0.95   # 5% SL
-                swing_tp = current_price * 1.10   # 10% TP  
-            else:  # SELL or HOLD
-                swing_sl = current_price * 1.05   # 5% SL
-                swing_tp = current_price * 0.90   # 10% TP
-                
-            swing_rr = abs((swing_tp - current_price) / (swing_sl - current_price)) if swing_sl != current_price else 1.0
-            
-            return {
-                'intraday': {
-                    'action': intraday_action,
-                    'entry': current_price,
-                    'sl': intraday_sl,
-                    'tp': intraday_tp,
-                    'rr': f"{intraday_rr:.1f}"
-                },
-                'swing': {
-                    'action': swing_action, 
-                    'entry': current_price,
-                    'sl': swing_sl,
-                    'tp': swing_tp,
-                    'rr': f"{swing_rr:.1f}"
-                }
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating trade levels: {e}")
-            return {
-                'intraday': {'action': 'HOLD', 'entry': 0, 'sl': 0, 'tp': 0, 'rr': '1.0'},
-                'swing': {'action': 'HOLD', 'entry': 0, 'sl': 0, 'tp': 0, 'rr': '1.0'}
+        current_price = anchor_candle.get('close') or 1000  # Default fallback for missing/zero close
+        intraday_action = self._determine_action(intraday)
+        swing_action = self._determine_action(swing)
+        
+        intraday_sl, intraday_tp, intraday_rr, swing_sl, swing_tp, swing_rr = _levels_for(
+            current_price, intraday_action, swing_action)
+        
+        return {
+            'intraday': {
+                'action': intraday_action,
+                'entry': current_price,
+                'sl': intraday_sl,
+                'tp': intraday_tp,
+                'rr': intraday_rr
+            },
+            'swing': {
+                'action': swing_action, 
+                'entry': current_price,
+                'sl': swing_sl,
+                'tp': swing_tp,
+                'rr': swing_rr
             }
+        }
     
-    def _determine_action(self, analysis: dict) -> str:
+    def _determine_action(self, signals: _Signals) -> str:
         """Determine BUY/SELL action based on technical analysis"""
-        try:
-            if not analysis:
-                return 'HOLD'
-                
-            trend = analysis.get('trend', 'neutral')
-            rsi_condition = analysis.get('rsi', {}).get('condition', 'neutral')
-            macd_condition = analysis.get('macd', {}).get('condition', 'neutral')
-            
-            bullish_signals = 0
-            bearish_signals = 0
-            
-            # Count bullish signals
-            if trend in ['bullish', 'strong_bullish']:
-                bullish_signals += 1
-            if rsi_condition in ['bullish', 'oversold']:
-                bullish_signals += 1  
-            if macd_condition == 'bullish':
-                bullish_signals += 1
-                
-            # Count bearish signals
-            if trend in ['bearish', 'strong_bearish']:
-                bearish_signals += 1
-            if rsi_condition in ['bearish', 'overbought']:
-                bearish_signals += 1
-            if macd_condition == 'bearish': 
-                bearish_signals += 1
-            
-            if bullish_signals > bearish_signals:
-                return 'BUY'
-            elif bearish_signals > bullish_signals:
-                return 'SELL'
-            else:
-                return 'HOLD'
-                
-        except Exception as e:
-            logger.error(f"Action determination error: {e}")
-            return 'HOLD'
+        if not _HAS_NUMBA:
+            return _action_from_signals(signals)
+        return _ACTIONS[_action_kernel(_encode_signals(signals))]
     
-    def _format_levels(self, levels: List[float]) -> str:
+    def _format_levels(self, levels: Sequence[float]) -> str:
         """Format support/resistance levels professionally"""
-        try:
-            if not levels or len(levels) == 0:
-                return "None identified"
-            
-            valid_levels = [level for level in levels if level > 0]
-            if not valid_levels:
-                return "Analysis pending"
-            
-            if len(valid_levels) == 1:
-                return f"{valid_levels[0]:.0f}"
-            else:
-                return f"{min(valid_levels):.0f}–{max(valid_levels):.0f}"
-        except Exception as e:
-            logger.error(f"Level formatting error: {e}")
-            return "Error formatting levels"
+        if levels is None or len(levels) == 0:
+            return "None identified"
+        
+        # One pass over the (at most a handful of) levels, tracking the positive min/max
+        it = iter(levels)
+        for lo in it:
+            if lo > 0:
+                break
+        else:
+            return "Analysis pending"
+        
+        hi = lo
+        multiple = False
+        for level in it:
+            if level > 0:
+                multiple = True
+                if level < lo:
+                    lo = level
+                elif level > hi:
+                    hi = level
+        
+        return f"{lo:.0f}–{hi:.0f}" if multiple else f"{lo:.0f}"
     
-    def _calculate_sentiment_score(self, intraday: dict, swing: dict) -> dict:
+    def _calculate_sentiment_score(self, intraday: _Signals, swing: _Signals) -> dict:
         """Calculate sentiment scores (0-1 scale)"""
-        try:
-            def analyze_sentiment(analysis):
-                if not analysis:
-                    return 0.5
-                    
-                score = 0.5  # neutral base
-                
-                # Trend contribution (30%)
-                trend = analysis.get('trend', 'neutral')
-                if trend in ['bullish', 'strong_bullish']:
-                    score += 0.15
-                elif trend in ['bearish', 'strong_bearish']:
-                    score -= 0.15
-                    
-                # RSI contribution (25%)
-                rsi_condition = analysis.get('rsi', {}).get('condition', 'neutral')
-                if rsi_condition in ['bullish', 'oversold']:
-                    score += 0.125
-                elif rsi_condition in ['bearish', 'overbought']:
-                    score -= 0.125
-                    
-                # MACD contribution (25%) 
-                macd_condition = analysis.get('macd', {}).get('condition', 'neutral')
-                if macd_condition == 'bullish':
-                    score += 0.125
-                elif macd_condition == 'bearish':
-                    score -= 0.125
-                    
-                # OBV contribution (20%)
-                obv_trend = analysis.get('obv', {}).get('trend', 'neutral')
-                if obv_trend == 'accumulation':
-                    score += 0.1
-                elif obv_trend == 'distribution':
-                    score -= 0.1
-                
-                return max(0.0, min(1.0, score))  # Clamp between 0-1
-            
-            return {
-                'short_term': analyze_sentiment(intraday),
-                'long_term': analyze_sentiment(swing)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating sentiment: {e}")
-            return {'short_term': 0.5, 'long_term': 0.5}
+        def analyze_sentiment(signals: _Signals) -> float:
+            if not _HAS_NUMBA:
+                return _score_signals(signals)
+            return _sentiment_kernel(_encode_signals(signals), _SIGNAL_WEIGHTS)
+        
+        return {
+            'short_term': analyze_sentiment(intraday),
+            'long_term': analyze_sentiment(swing)
+        }
     
     def _generate_market_narrative(self, price_info: dict, sentiment: dict) -> str:
         """Generate market narrative based on current conditions"""
-        try:
-            change_24h = price_info.get('change_24h', 0)
-            
-            narratives = []
-            
-            # Price action narrative
-            if change_24h > 5:
-                narratives.append(f"• **Strong bullish momentum** → +{change_24h:.1f}% daily surge")
-            elif change_24h > 2:
-                narratives.append(f"• **Moderate bullish bias** → +{change_24h:.1f}% daily gains")
-            elif change_24h < -5:
-                narratives.append(f"• **Heavy selling pressure** → {change_24h:.1f}% daily decline")
-            elif change_24h < -2:
-                narratives.append(f"• **Mild bearish pressure** → {change_24h:.1f}% daily dip")
-            else:
-                narratives.append(f"• **Consolidation phase** → {change_24h:.1f}% daily range")
-            
-            # Sentiment-based narrative
-            short_term = sentiment.get('short_term', 0.5)
-            long_term = sentiment.get('long_term', 0.5)
-            avg_sentiment = (short_term + long_term) / 2
-            
-            if avg_sentiment > 0.65:
-                narratives.append("• **Market confidence high** → Multiple bullish confluences")
-            elif avg_sentiment < 0.35:
-                narratives.append("• **Caution warranted** → Multiple bearish signals present")
-            else:
-                narratives.append("• **Mixed signals** → Market in transition phase")
-            
-            # Additional context
-            narratives.append("• **Institutional flows** → Monitor for breakout confirmation")
-            
-            return "\n".join(narratives)
-            
-        except Exception as e:
-            logger.error(f"Error generating narrative: {e}")
-            return "• **Analysis in progress** → Gathering market data"
-
+        change_24h = price_info.get('change_24h') or 0  # Tickers may report null
+        
+        # Price action narrative
+        bucket = bisect_right(_CHANGE_LOWER, change_24h) + bisect_left(_CHANGE_UPPER, change_24h)
+        price_line = _CHANGE_TMPL[bucket].format(change_24h)
+        
+        # Sentiment-based narrative
+        short_term = sentiment.get('short_term', 0.5)
+        long_term = sentiment.get('long_term', 0.5)
+        avg_sentiment = (short_term + long_term) / 2
+        bucket = bisect_right(_SENT_LOWER, avg_sentiment) + bisect_left(_SENT_UPPER, avg_sentiment)
+        
+        # Additional context closes every narrative
+        return f"{price_line}\n{_SENT_NARRATIVE[bucket]}\n• <b>Institutional flows</b> → Monitor for breakout confirmation"
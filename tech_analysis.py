@@ -3,107 +3,217 @@ Enhanced technical analysis with TA-Lib fallbacks and advanced indicators
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
+from bisect import bisect_left
+from numpy.lib.stride_tricks import sliding_window_view
+from _njit import njit, HAS_NUMBA as _HAS_NUMBA
 
 logger = logging.getLogger(__name__)
 
+# RSI condition buckets; upper edges are inclusive (rsi == 80 is 'overbought'),
+# so np.digitize(rsi, _RSI_BUCKETS, right=True) gives the same index for arrays
+_RSI_BUCKETS = (20, 30, 40, 60, 70, 80)
+_RSI_LABELS = ('extremely_oversold', 'oversold', 'bearish', 'neutral',
+               'bullish', 'overbought', 'extremely_overbought')
+
+# TA-Lib is optional; resolved once at import, with manual calculations as fallback
+try:
+    import talib as _TALIB
+except ImportError:
+    _TALIB = None
+
+def _trailing_mean(values: np.ndarray, window: int) -> float:
+    """Mean of the last `window` values; NaN when shorter, like rolling(window).mean().iloc[-1]"""
+    if values.shape[0] < window:
+        return np.nan
+    return float(values[-window:].mean())
+
+@njit(cache=True)
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Adjusted EMA, matching pandas ewm(span=span).mean() including NaN handling"""
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    decay = 1.0 - 2.0 / (span + 1.0)
+    weighted = x[0]
+    old_wt = 1.0
+    out[0] = weighted
+    for i in range(1, n):
+        cur = x[i]
+        observed = cur == cur
+        if weighted == weighted:
+            old_wt *= decay
+            if observed:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + cur) / (old_wt + 1.0)
+                old_wt += 1.0
+        elif observed:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+@njit(cache=True)
+def _wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing: SMA seed over the first `period` values, then (prev*(p-1) + x)/p"""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+    avg = x[:period].mean()
+    out[period - 1] = avg
+    for i in range(period, n):
+        avg = (avg * (period - 1) + x[i]) / period
+        out[i] = avg
+    return out
+
+def _centered_pivots(values: np.ndarray, window: int, reduce) -> np.ndarray:
+    """Indices where values equal their centered window extreme, like rolling(window, center=True)"""
+    if len(values) < window:
+        return np.empty(0, dtype=np.intp)
+    extreme = np.full(len(values), np.nan)
+    windows = reduce(sliding_window_view(values, window), axis=1)
+    extreme[window // 2:window // 2 + len(windows)] = windows
+    return np.flatnonzero(values == extreme)
+
+def _obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """OBV as a prefix sum of signed volume: + on up-closes, - on down-closes, 0 otherwise"""
+    if close.shape[0] == 0:
+        return np.empty(0)
+    prev, cur = close[:-1], close[1:]
+    steps = np.empty_like(volume)
+    steps[0] = volume[0]
+    # Comparisons (not np.sign) so NaN closes carry the previous value, as a flat bar does
+    steps[1:] = np.where(cur > prev, volume[1:], np.where(cur < prev, -volume[1:], 0.0))
+    return np.cumsum(steps)
+
 class ProfessionalAnalysis:
+    USE_TALIB = _TALIB is not None
+    _warmed = False  # Kernels are compiled once per process, by the first instance
+    
     def __init__(self):
-        # Try to import TA-Lib, fallback to manual calculations
-        self.use_talib = False
-        try:
-            import talib
-            self.talib = talib
-            self.use_talib = True
+        if self.USE_TALIB:
             logger.info("✅ TA-Lib available - using optimized calculations")
-        except ImportError:
+        else:
             logger.info("⚠️ TA-Lib not available - using manual calculations")
+        if not ProfessionalAnalysis._warmed:
+            self.warm_up()
+    
+    @classmethod
+    def warm_up(cls) -> None:
+        """Compile the njit kernels on dummy data so the first analysis doesn't pay for it"""
+        cls._warmed = True
+        if not _HAS_NUMBA:
+            return
+        try:
+            dummy = np.arange(100, dtype=np.float64)
+            _ema(dummy, 12)
+            _wilder(dummy, 14)
+            # The report kernels are JIT-compiled too; warm them with the indicators
+            from report_formatter import warm_up_kernels
+            warm_up_kernels()
+            logger.info("✅ Numba indicator and report kernels compiled")
+        except Exception as e:
+            logger.warning(f"⚠️ Numba warm-up failed, kernels will compile on first use: {e}")
     
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Enhanced RSI with TA-Lib fallback"""
+        rsi = self._rsi_np(prices.to_numpy(dtype=np.float64), period)
+        return pd.Series(rsi, index=prices.index) if rsi is not None else pd.Series(index=prices.index)
+    
+    def _rsi_np(self, close: np.ndarray, period: int = 14) -> Optional[np.ndarray]:
+        """RSI over a close array; None on failure"""
         try:
-            if self.use_talib:
-                rsi_values = self.talib.RSI(prices.values, timeperiod=period)
-                return pd.Series(rsi_values, index=prices.index)
+            if self.USE_TALIB:
+                return _TALIB.RSI(close, timeperiod=period)
             else:
-                # Manual calculation fallback
-                delta = prices.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-                rs = gain / loss
-                return 100 - (100 / (1 + rs))
+                # Manual calculation fallback: Wilder RSI, as TA-Lib computes it
+                delta = np.diff(close)
+                avg_gain = _wilder(np.where(delta > 0, delta, 0.0), period)
+                avg_loss = _wilder(np.where(delta < 0, -delta, 0.0), period)
+                rsi = np.empty(len(close))
+                rsi[:1] = np.nan  # No change is defined for the first bar
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rsi[1:] = 100 - (100 / (1 + avg_gain / avg_loss))
+                return rsi
         except Exception as e:
             logger.error(f"RSI calculation error: {e}")
-            return pd.Series(index=prices.index)
+            return None
     
     def calculate_macd(self, prices: pd.Series, fast=12, slow=26, signal=9) -> Dict:
         """Enhanced MACD with TA-Lib fallback"""
+        macd_data = self._macd_np(prices.to_numpy(dtype=np.float64), fast, slow, signal)
+        if macd_data is None:
+            return {'macd': pd.Series(), 'signal': pd.Series(), 'histogram': pd.Series()}
+        return {key: pd.Series(values, index=prices.index) for key, values in macd_data.items()}
+    
+    def _macd_np(self, close: np.ndarray, fast=12, slow=26, signal=9) -> Optional[Dict[str, np.ndarray]]:
+        """MACD line/signal/histogram arrays over a close array; None on failure"""
         try:
-            if self.use_talib:
-                macd, signal_line, histogram = self.talib.MACD(prices.values, 
-                                                             fastperiod=fast, 
-                                                             slowperiod=slow, 
-                                                             signalperiod=signal)
-                return {
-                    'macd': pd.Series(macd, index=prices.index),
-                    'signal': pd.Series(signal_line, index=prices.index),
-                    'histogram': pd.Series(histogram, index=prices.index)
-                }
+            if self.USE_TALIB:
+                macd_line, signal_line, histogram = _TALIB.MACD(close, 
+                                                                  fastperiod=fast, 
+                                                                  slowperiod=slow, 
+                                                                  signalperiod=signal)
             else:
                 # Manual calculation fallback
-                exp1 = prices.ewm(span=fast).mean()
-                exp2 = prices.ewm(span=slow).mean()
-                macd_line = exp1 - exp2
-                signal_line = macd_line.ewm(span=signal).mean()
+                macd_line = _ema(close, fast) - _ema(close, slow)
+                signal_line = _ema(macd_line, signal)
                 histogram = macd_line - signal_line
-                
-                return {
-                    'macd': macd_line,
-                    'signal': signal_line, 
-                    'histogram': histogram
-                }
+            
+            return {'macd': macd_line, 'signal': signal_line, 'histogram': histogram}
         except Exception as e:
             logger.error(f"MACD calculation error: {e}")
-            return {'macd': pd.Series(), 'signal': pd.Series(), 'histogram': pd.Series()}
+            return None
     
     def calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_dev: float = 2) -> Dict:
         """NEW: Bollinger Bands calculation"""
+        bb_data = self._bollinger_np(prices.to_numpy(dtype=np.float64), period, std_dev)
+        if bb_data is None:
+            return {'upper': pd.Series(), 'middle': pd.Series(), 'lower': pd.Series()}
+        return {key: pd.Series(values, index=prices.index) for key, values in bb_data.items()}
+    
+    def _bollinger_np(self, close: np.ndarray, period: int = 20, std_dev: float = 2) -> Optional[Dict[str, np.ndarray]]:
+        """Bollinger Band arrays over a close array; None on failure"""
         try:
-            if self.use_talib:
-                upper, middle, lower = self.talib.BBANDS(prices.values, 
+            if self.USE_TALIB:
+                upper, middle, lower = _TALIB.BBANDS(close, 
                                                        timeperiod=period, 
                                                        nbdevup=std_dev, 
                                                        nbdevdn=std_dev)
-                return {
-                    'upper': pd.Series(upper, index=prices.index),
-                    'middle': pd.Series(middle, index=prices.index),
-                    'lower': pd.Series(lower, index=prices.index)
-                }
             else:
-                sma = prices.rolling(period).mean()
-                std = prices.rolling(period).std()
-                return {
-                    'upper': sma + (std * std_dev),
-                    'middle': sma,
-                    'lower': sma - (std * std_dev)
-                }
+                # Sample std over full windows, NaN until the first one, like rolling(period)
+                middle = np.full(len(close), np.nan)
+                std = np.full(len(close), np.nan)
+                if len(close) >= period:
+                    windows = sliding_window_view(close, period)
+                    middle[period - 1:] = windows.mean(axis=1)
+                    std[period - 1:] = windows.std(axis=1, ddof=1)
+                upper = middle + (std * std_dev)
+                lower = middle - (std * std_dev)
+            
+            return {'upper': upper, 'middle': middle, 'lower': lower}
         except Exception as e:
             logger.error(f"Bollinger Bands error: {e}")
-            return {'upper': pd.Series(), 'middle': pd.Series(), 'lower': pd.Series()}
+            return None
     
     def identify_support_resistance(self, df: pd.DataFrame, window: int = 20) -> Dict:
         """ENHANCED: Better support/resistance identification"""
+        return self._support_resistance_np(
+            df['high'].to_numpy(dtype=np.float64),
+            df['low'].to_numpy(dtype=np.float64),
+            df['close'].iloc[-1],
+            window,
+        )
+    
+    def _support_resistance_np(self, high: np.ndarray, low: np.ndarray, current_price: float,
+                               window: int = 20) -> Dict:
+        """Support/resistance levels from high/low arrays"""
         try:
-            # Find pivot points using rolling max/min
-            highs = df['high'].rolling(window=window, center=True).max()
-            lows = df['low'].rolling(window=window, center=True).min()
-            
-            # Identify pivot highs and lows
-            pivot_highs = df[df['high'] == highs]['high'].dropna().tail(5)
-            pivot_lows = df[df['low'] == lows]['low'].dropna().tail(5)
-            
-            current_price = df['close'].iloc[-1]
+            # Find pivot points as bars equal to their centered window max/min
+            pivot_highs = high[_centered_pivots(high, window, np.max)[-5:]]
+            pivot_lows = low[_centered_pivots(low, window, np.min)[-5:]]
             
             # Filter relevant levels
             resistance_levels = pivot_highs[pivot_highs > current_price * 1.001].tolist()
@@ -122,28 +232,35 @@ class ProfessionalAnalysis:
     
     def calculate_volume_profile(self, df: pd.DataFrame) -> Dict:
         """NEW: Volume profile analysis"""
+        return self._volume_profile_np(df['close'].to_numpy(dtype=np.float64),
+                                       df['volume'].to_numpy(dtype=np.float64))
+    
+    def _volume_profile_np(self, close: np.ndarray, volume: np.ndarray) -> Dict:
+        """Volume profile from close/volume arrays"""
         try:
-            # Simple volume profile approximation
-            price_bins = pd.cut(df['close'], bins=20)
-            volume_by_price = df.groupby(price_bins)['volume'].sum()
+            # Simple volume profile approximation: volume-weighted close histogram
+            valid = np.isfinite(close)
+            volume_by_price, edges = np.histogram(
+                close[valid], bins=20, weights=np.nan_to_num(volume[valid])
+            )
             
             # Find Point of Control (POC) - highest volume area
-            poc_bin = volume_by_price.idxmax()
-            poc_price = (poc_bin.left + poc_bin.right) / 2
+            poc_idx = volume_by_price.argmax()
+            poc_price = (edges[poc_idx] + edges[poc_idx + 1]) / 2
             
             # Value Area (70% of volume)
             total_volume = volume_by_price.sum()
             value_area_volume = total_volume * 0.7
             
             return {
-                'poc': float(poc_price) if not pd.isna(poc_price) else df['close'].iloc[-1],
+                'poc': float(poc_price) if not pd.isna(poc_price) else close[-1],
                 'total_volume': float(total_volume),
-                'distribution': 'balanced' if abs(poc_price - df['close'].iloc[-1]) / df['close'].iloc[-1] < 0.02 else 'skewed'
+                'distribution': 'balanced' if abs(poc_price - close[-1]) / close[-1] < 0.02 else 'skewed'
             }
             
         except Exception as e:
             logger.error(f"Volume profile error: {e}")
-            return {'poc': df['close'].iloc[-1] if not df.empty else 0, 'distribution': 'unknown'}
+            return {'poc': close[-1] if len(close) else 0, 'distribution': 'unknown'}
     
     def analyze_timeframe(self, df: pd.DataFrame, timeframe: str) -> Dict:
         """ENHANCED: Enhanced timeframe analysis with new indicators"""
@@ -151,15 +268,21 @@ class ProfessionalAnalysis:
             if df.empty:
                 return {'error': 'Empty dataframe'}
             
+            # Materialize the OHLCV columns once; every indicator below works on these arrays
+            close = df['close'].to_numpy(dtype=np.float64)
+            high = df['high'].to_numpy(dtype=np.float64)
+            low = df['low'].to_numpy(dtype=np.float64)
+            volume = df['volume'].to_numpy(dtype=np.float64)
+            
             analysis = {}
             current_price = df['close'].iloc[-1]
             analysis['current_price'] = current_price
             
             # Enhanced RSI Analysis
-            rsi = self.calculate_rsi(df['close'])
-            if not rsi.empty:
-                current_rsi = rsi.iloc[-1]
-                rsi_trend = 'rising' if rsi.iloc[-1] > rsi.iloc[-3] else 'falling'
+            rsi = self._rsi_np(close)
+            if rsi is not None:
+                current_rsi = rsi[-1]
+                rsi_trend = 'rising' if rsi[-1] > rsi[-3] else 'falling'
                 analysis['rsi'] = {
                     'value': current_rsi,
                     'condition': self._enhanced_rsi_condition(current_rsi),
@@ -167,22 +290,22 @@ class ProfessionalAnalysis:
                 }
             
             # Enhanced MACD Analysis  
-            macd_data = self.calculate_macd(df['close'])
-            if not macd_data['macd'].empty:
+            macd_data = self._macd_np(close)
+            if macd_data is not None:
                 macd_condition = self._enhanced_macd_condition(macd_data)
                 crossover = self._detect_macd_crossover(macd_data)
                 
                 analysis['macd'] = {
-                    'macd': macd_data['macd'].iloc[-1],
-                    'signal': macd_data['signal'].iloc[-1],
-                    'histogram': macd_data['histogram'].iloc[-1],
+                    'macd': macd_data['macd'][-1],
+                    'signal': macd_data['signal'][-1],
+                    'histogram': macd_data['histogram'][-1],
                     'condition': macd_condition,
                     'crossover': crossover
                 }
             
             # NEW: Bollinger Bands
-            bb_data = self.calculate_bollinger_bands(df['close'])
-            if not bb_data['middle'].empty:
+            bb_data = self._bollinger_np(close)
+            if bb_data is not None:
                 bb_position = self._determine_bb_position(current_price, bb_data)
                 analysis['bollinger'] = {
                     'position': bb_position,
@@ -190,24 +313,24 @@ class ProfessionalAnalysis:
                 }
             
             # Enhanced Support/Resistance
-            sr_levels = self.identify_support_resistance(df)
+            sr_levels = self._support_resistance_np(high, low, current_price)
             analysis['support_resistance'] = sr_levels
             
             # NEW: Volume Profile
-            volume_analysis = self.calculate_volume_profile(df)
+            volume_analysis = self._volume_profile_np(close, volume)
             analysis['volume_profile'] = volume_analysis
             
             # Enhanced OBV
-            obv = self.calculate_obv(df)
-            if not obv.empty:
-                obv_trend = 'accumulation' if obv.iloc[-1] > obv.iloc[-5] else 'distribution'
+            obv = _obv(close, volume)
+            if len(obv):
+                obv_trend = 'accumulation' if obv[-1] > obv[-5] else 'distribution'
                 analysis['obv'] = {
-                    'value': obv.iloc[-1],
+                    'value': obv[-1],
                     'trend': obv_trend
                 }
             
             # Enhanced trend determination
-            analysis['trend'] = self._determine_enhanced_trend(df, analysis)
+            analysis['trend'] = self._determine_enhanced_trend(close, analysis)
             analysis['timeframe'] = timeframe
             analysis['confidence'] = self._calculate_confidence_score(analysis)
             
@@ -219,27 +342,14 @@ class ProfessionalAnalysis:
     
     def _enhanced_rsi_condition(self, rsi: float) -> str:
         """Enhanced RSI interpretation"""
-        if rsi > 80:
-            return 'extremely_overbought'
-        elif rsi > 70:
-            return 'overbought'
-        elif rsi > 60:
-            return 'bullish'
-        elif rsi > 40:
-            return 'neutral'
-        elif rsi > 30:
-            return 'bearish'
-        elif rsi > 20:
-            return 'oversold'
-        else:
-            return 'extremely_oversold'
+        return _RSI_LABELS[bisect_left(_RSI_BUCKETS, rsi)]
     
     def _enhanced_macd_condition(self, macd_data: dict) -> str:
         """Enhanced MACD analysis"""
         try:
-            macd = macd_data['macd'].iloc[-1]
-            signal = macd_data['signal'].iloc[-1]
-            histogram = macd_data['histogram'].iloc[-1]
+            macd = macd_data['macd'][-1]
+            signal = macd_data['signal'][-1]
+            histogram = macd_data['histogram'][-1]
             
             if macd > signal and histogram > 0:
                 return 'bullish'
@@ -253,8 +363,8 @@ class ProfessionalAnalysis:
     def _detect_macd_crossover(self, macd_data: dict) -> str:
         """Detect MACD crossovers"""
         try:
-            current_histogram = macd_data['histogram'].iloc[-1]
-            previous_histogram = macd_data['histogram'].iloc[-2]
+            current_histogram = macd_data['histogram'][-1]
+            previous_histogram = macd_data['histogram'][-2]
             
             if current_histogram > 0 and previous_histogram <= 0:
                 return 'bullish_crossover'
@@ -268,9 +378,9 @@ class ProfessionalAnalysis:
     def _determine_bb_position(self, price: float, bb_data: dict) -> str:
         """Determine Bollinger Band position"""
         try:
-            upper = bb_data['upper'].iloc[-1]
-            middle = bb_data['middle'].iloc[-1]
-            lower = bb_data['lower'].iloc[-1]
+            upper = bb_data['upper'][-1]
+            middle = bb_data['middle'][-1]
+            lower = bb_data['lower'][-1]
             
             if price > upper:
                 return 'above_upper'
@@ -286,18 +396,22 @@ class ProfessionalAnalysis:
     def _detect_bb_squeeze(self, bb_data: dict) -> bool:
         """Detect Bollinger Band squeeze"""
         try:
-            current_width = bb_data['upper'].iloc[-1] - bb_data['lower'].iloc[-1]
-            avg_width = (bb_data['upper'] - bb_data['lower']).rolling(20).mean().iloc[-1]
+            upper, lower = bb_data['upper'], bb_data['lower']
+            if len(upper) < 20:
+                return False  # No full 20-bar average width yet
+            current_width = upper[-1] - lower[-1]
+            avg_width = (upper[-20:] - lower[-20:]).mean()
             return current_width < avg_width * 0.8
         except:
             return False
     
-    def _determine_enhanced_trend(self, df: pd.DataFrame, analysis: dict) -> str:
+    def _determine_enhanced_trend(self, close: np.ndarray, analysis: dict) -> str:
         """Enhanced trend determination with multiple factors"""
         try:
-            current_price = df['close'].iloc[-1]
-            sma_20 = df['close'].rolling(20).mean().iloc[-1]
-            sma_50 = df['close'].rolling(50).mean().iloc[-1]
+            current_price = close[-1]
+            # Only the latest SMA values are used; average the trailing windows directly
+            sma_20 = _trailing_mean(close, 20)
+            sma_50 = _trailing_mean(close, 50)
             
             # Price vs SMAs
             price_trend_score = 0
@@ -377,18 +491,8 @@ class ProfessionalAnalysis:
     def calculate_obv(df: pd.DataFrame) -> pd.Series:
         """Calculate On-Balance Volume (existing method kept)"""
         try:
-            obv = pd.Series(index=df.index, dtype='float64')
-            obv.iloc[0] = df['volume'].iloc[0]
-            
-            for i in range(1, len(df)):
-                if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                    obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
-                elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                    obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
-                else:
-                    obv.iloc[i] = obv.iloc[i-1]
-                    
-            return obv
+            obv = _obv(df['close'].to_numpy(dtype=np.float64), df['volume'].to_numpy(dtype=np.float64))
+            return pd.Series(obv, index=df.index)
         except:
             return pd.Series(index=df.index)
 
@@ -1,13 +1,19 @@
 """
 Telegram controller for professional crypto analysis reports
 """
+import asyncio
 import logging
+from functools import lru_cache
 from telegram import Update
+from telegram.constants import ParseMode
 from telegram.ext import Application, CommandHandler, ContextTypes
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Up to this many parts go out back-to-back; longer bursts are paced 1/sec for the flood limit
+_BURST_PARTS = 3
+
 class AnalysisTelegramController:
     def __init__(self, config):
         self.config = config
@@ -94,17 +100,18 @@ class AnalysisTelegramController:
 
 **Ready to receive professional-grade analysis!** 📊
         """
-        await update.message.reply_text(welcome_msg, parse_mode='Markdown')
+        await update.message.reply_text(welcome_msg, parse_mode=ParseMode.MARKDOWN)
 
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        status_msg = """
+        now = datetime.now()  # One clock read so the time and countdown agree
+        status_msg = f"""
 ✅ **Analysis Bot Status**
 
 🤖 **Status:** Active & Monitoring
 📊 **Primary Asset:** ETHUSDT
 ⏰ **Analysis Frequency:** Every 60 minutes
-🔄 **Last Update:** {time}
+🔄 **Last Update:** {now.strftime('%H:%M:%S %Z')}
 📡 **Data Source:** Binance (Real-time)
 
 🎯 **Active Features:**
@@ -113,18 +120,15 @@ class AnalysisTelegramController:
 • Risk management calculations
 • Sentiment scoring algorithm
 
-**📈 Next analysis in ~{next} minutes**
-        """.format(
-            time=datetime.now().strftime('%H:%M:%S %Z'),
-            next=60 - datetime.now().minute
-        )
-        await update.message.reply_text(status_msg, parse_mode='Markdown')
+**📈 Next analysis in ~{60 - now.minute} minutes**
+        """
+        await update.message.reply_text(status_msg, parse_mode=ParseMode.MARKDOWN)
 
     async def analyze_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /analyze command"""
         await update.message.reply_text(
             "📊 **Generating professional analysis...**\n⏱️ Please wait 10-15 seconds",
-            parse_mode='Markdown'
+            parse_mode=ParseMode.MARKDOWN
         )
         # Trigger analysis generation would happen here
 
@@ -159,10 +163,10 @@ class AnalysisTelegramController:
 
 **📈 Professional-grade analysis at your fingertips!**
         """
-        await update.message.reply_text(help_msg, parse_mode='Markdown')
+        await update.message.reply_text(help_msg, parse_mode=ParseMode.MARKDOWN)
 
     async def send_analysis_report(self, report: str):
-        """Send professional analysis report"""
+        """Send professional analysis report (HTML, as rendered by the report formatter)"""
         if not self.initialized or not self.config.TELEGRAM_CHAT_ID:
             logger.warning("❌ Cannot send report - Telegram not configured")
             return False
@@ -170,20 +174,12 @@ class AnalysisTelegramController:
         try:
             # Split long reports if needed (Telegram has 4096 char limit)
             if len(report) > 4000:
-                parts = self._split_report(report)
-                for i, part in enumerate(parts):
-                    await self.application.bot.send_message(
-                        chat_id=self.config.TELEGRAM_CHAT_ID,
-                        text=part,
-                        parse_mode='Markdown'
-                    )
-                    if i < len(parts) - 1:  # Add delay between parts
-                        await asyncio.sleep(1)
+                await self._send_parts(self._split_report(report))
             else:
                 await self.application.bot.send_message(
                     chat_id=self.config.TELEGRAM_CHAT_ID,
                     text=report,
-                    parse_mode='Markdown'
+                    parse_mode=ParseMode.HTML
                 )
 
             logger.info("✅ Analysis report sent successfully")
@@ -193,21 +189,34 @@ class AnalysisTelegramController:
             logger.error(f"❌ Error sending analysis report: {e}")
             return False
 
-    def _split_report(self, report: str, max_length: int = 4000) -> list:
-        """Split long reports into multiple messages"""
+    async def _send_parts(self, parts: tuple):
+        """Send report parts in order, stopping at the first failed send"""
+        paced = len(parts) > _BURST_PARTS
+        for i, part in enumerate(parts):
+            await self.application.bot.send_message(
+                chat_id=self.config.TELEGRAM_CHAT_ID,
+                text=part,
+                parse_mode=ParseMode.HTML
+            )
+            if paced and i < len(parts) - 1:  # Pace long bursts for the flood limit
+                await asyncio.sleep(1)
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _split_report(report: str, max_length: int = 4000) -> tuple:
+        """Split long reports into multiple messages; memoized so resends skip the re-split"""
         lines = report.split('\n')
         parts = []
-        current_part = ""
+        start = 0
+        size = 0  # Length of lines[start:i] with one newline per line
 
-        for line in lines:
-            if len(current_part + line + '\n') > max_length:
-                if current_part:
-                    parts.append(current_part.strip())
-                current_part = line + '\n'
-            else:
-                current_part += line + '\n'
+        for i, line in enumerate(lines):
+            line_len = len(line) + 1
+            if size and size + line_len > max_length:
+                parts.append('\n'.join(lines[start:i]).strip())
+                start, size = i, 0
+            size += line_len
 
-        if current_part:
-            parts.append(current_part.strip())
+        parts.append('\n'.join(lines[start:]).strip())
 
-        return parts
+        return tuple(parts)